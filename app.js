@@ -7,6 +7,13 @@ const languageSelect = document.getElementById('languageSelect');
 let recognition = null;
 let isRecording = false;
 
+// Live detection state: the server scores only appended text for this session
+const detectSessionId = Date.now().toString(36) + Math.random().toString(36).slice(2);
+const DETECT_DEBOUNCE_MS = 300;
+let detectTimer = null;
+let lastDetectedText = '';
+let detectionStable = false;
+
 // Language mapping for speech recognition
 const languageMapping = {
     'hi': 'hi-IN',
@@ -45,7 +52,7 @@ function initializeSpeechRecognition(lang = 'en-IN') { // Set to 'en-IN' for ini
             }
             if (finalTranscript !== '') {
                 inputText.value = finalTranscript;
-                detectLanguage(finalTranscript);
+                scheduleDetectLanguage(finalTranscript);
             }
         };
 
@@ -60,15 +67,27 @@ function initializeSpeechRecognition(lang = 'en-IN') { // Set to 'en-IN' for ini
     }
 }
 
+function scheduleDetectLanguage(text) {
+    clearTimeout(detectTimer);
+    detectTimer = setTimeout(() => detectLanguage(text), DETECT_DEBOUNCE_MS);
+}
+
 function detectLanguage(text) {
+    // Once the language is stable, typing more of the same text needs no new request
+    if (detectionStable && text.startsWith(lastDetectedText)) {
+        return;
+    }
+    lastDetectedText = text;
+
     fetch('http://127.0.0.1:5000/detect', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text: text })
+        body: JSON.stringify({ text: text, session_id: detectSessionId })
     })
     .then(response => response.json())
     .then(data => {
         if (data.detected_language) {
+            detectionStable = Boolean(data.stable) && text === lastDetectedText;
             const detectedLang = data.detected_language;
             console.log('Detected language:', detectedLang);
             
@@ -106,10 +125,21 @@ recordBtn.addEventListener('click', function() {
 // Input text change handler
 inputText.addEventListener('input', function() {
     if (inputText.value.trim()) {
-        detectLanguage(inputText.value);
+        scheduleDetectLanguage(inputText.value);
     }
 });
 
+// Play server-side gTTS audio (cached per phrase), falling back to the browser voice
+function speakText(text, lang) {
+    const url = `http://127.0.0.1:5000/tts?lang=${encodeURIComponent(lang)}&text=${encodeURIComponent(text)}`;
+    const audio = new Audio(url);
+    audio.play().catch(() => {
+        const speech = new SpeechSynthesisUtterance(text);
+        speech.lang = lang;
+        window.speechSynthesis.speak(speech);
+    });
+}
+
 // Translate button click handler
 translateBtn.addEventListener('click', function() {
     const text = inputText.value.trim();
@@ -132,10 +162,7 @@ translateBtn.addEventListener('click', function() {
         if (data.translated_text) {
             outputDiv.textContent = `Translated Text: ${data.translated_text}`;
             
-            // Speak the translated text
-            const speech = new SpeechSynthesisUtterance(data.translated_text);
-            speech.lang = targetLang;
-            window.speechSynthesis.speak(speech);
+            speakText(data.translated_text, targetLang);
         } else {
             outputDiv.textContent = `Error: ${data.error}`;
         }
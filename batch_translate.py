@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core.metrics import metrics, submit_with_context
+from core import speech_output
+from core import translation
+INPUT_SUFFIXES = ('.txt', '.srt', '.jsonl')
+BATCH_WORKERS = 4
+# Lines in flight per worker; bounds memory however large the input is
+WINDOW_PER_WORKER = 8
+# Lines sent to the translator in one call, so the local model generates them as one batch
+BATCH_LINES = WINDOW_PER_WORKER
+REPORT_EVERY_LINES = 100
+
+_SRT_TIMING_RE = re.compile(r'^\d{2}:\d{2}:\d{2}[,.]\d{3} --> \d{2}:\d{2}:\d{2}[,.]\d{3}')
+
+
+# Each reader yields (key, text, extra): key is stable across runs so a restart can skip finished lines
+def read_txt(path):
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                yield str(line_no), line.rstrip('\r\n'), None
+
+
+def read_srt(path):
+    with open(path, encoding='utf-8-sig') as f:
+        block = []
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line.strip():
+                block.append(line)
+                continue
+            if block:
+                yield from _srt_block(block)
+                block = []
+        if block:
+            yield from _srt_block(block)
+
+
+def _srt_block(block):
+    if len(block) >= 3 and block[0].strip().isdigit() and _SRT_TIMING_RE.match(block[1]):
+        yield block[0].strip(), "\n".join(block[2:]), block[1]
+
+
+# A line that isn't a JSON object with a string field comes back with text None and
+# extra {'raw', 'error'}, so it is recorded as a failed line rather than ending the run
+def read_jsonl(path, field='text'):
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield str(line_no), None, {'raw': line.rstrip('\r\n'), 'error': f"Invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict) or not isinstance(record.get(field), str):
+                yield str(line_no), None, {'raw': line.rstrip('\r\n'), 'error': f"No '{field}' string in record"}
+                continue
+            yield str(record.get('id', line_no)), record[field], record
+
+
+READERS = {'.txt': read_txt, '.srt': read_srt, '.jsonl': read_jsonl}
+
+
+def iter_input_files(input_dir):
+    for name in sorted(os.listdir(input_dir)):
+        if name.endswith(INPUT_SUFFIXES):
+            yield os.path.join(input_dir, name)
+
+
+def load_done(journal_path):
+    done = {}
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a crash; that line is redone
+            if 'error' not in record:  # Failed lines are retried on the next run
+                done[record['id']] = record
+    return done
+
+
+def _failed(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+class BatchTranslator:
+    """Translates files line by line through the shared translation path.
+
+    Lines are translated in batches of ``BATCH_LINES`` on a bounded pool with
+    a sliding window, so output is written in input order as soon as the head
+    of the window is ready. Identical lines reach the translator once:
+    duplicates within a batch are sent once and later ones hit the translation
+    cache. Every finished line is appended to a per-file journal, which is
+    what makes a rerun resume.
+    """
+
+    def __init__(self, source_lang, target_lang, workers=BATCH_WORKERS, emotion=False, audio=False):
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.workers = workers
+        self.emotion = emotion
+        self.audio = audio
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-translate")
+        # Separate pool: each synthesis waits on its line's translation first
+        self._audio_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-tts")
+        self._classifier = None
+        self.lines = 0
+        self.skipped = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def classifier(self):
+        if self._classifier is None:
+            from core.components import registry
+            self._classifier = registry.get('emotion_classifier')
+        return self._classifier
+
+    def _translate(self, texts):
+        return submit_with_context(self._executor, translation.translate_batch, texts, self.source_lang, self.target_lang)
+
+    # A classifier that fails to load is reported on the line like a failed classification
+    def _classify(self, text):
+        try:
+            return self.classifier().submit(text)
+        except Exception as e:
+            return _failed(e)
+
+    # Synthesis starts as soon as the line's batch is translated, alongside the other lines
+    def _synthesize(self, future, index):
+        def run():
+            return speech_output.synthesize_to_path(future.result()[index], self.target_lang)
+        return submit_with_context(self._audio_executor, run)
+
+    # future is the line's batch; index is the line's place in it
+    def _finish(self, key, text, extra, future, index, emotion_future, audio_future):
+        record = {'id': key, 'text': text}
+        try:
+            record['translation'] = future.result()[index]
+        except Exception as e:
+            record['error'] = str(e)
+            self.errors += 1
+            return record
+        # Emotion and audio failures are recorded next to the translation, which is kept either way
+        if emotion_future is not None:
+            try:
+                emotion, score, _ = emotion_future.result()
+                record['emotion'] = emotion
+                record['emotion_score'] = score
+            except Exception as e:
+                record['emotion_error'] = str(e)
+        if audio_future is not None:
+            try:
+                record['audio'] = audio_future.result()
+            except Exception as e:
+                record['audio_error'] = str(e)
+        if extra is not None:
+            record['extra'] = extra
+        return record
+
+    def translate_file(self, path, output_dir):
+        suffix = os.path.splitext(path)[1]
+        base = os.path.join(output_dir, f"{os.path.basename(path)}.{self.target_lang}")
+        journal_path = base + '.journal.jsonl'
+        done = load_done(journal_path)
+
+        window = deque()
+        batch = []
+        with open(journal_path, 'a', encoding='utf-8') as journal:
+            def drain(limit):
+                while len(window) > limit:
+                    record = self._finish(*window.popleft())
+                    # One line per record, flushed, so a crash loses at most what was in flight
+                    journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    journal.flush()
+                    if 'error' not in record:
+                        done[record['id']] = record
+                    self._count()
+
+            def submit_batch():
+                if batch:
+                    future = self._translate([text for _, text, _, _ in batch])
+                    for index, (key, text, extra, emotion_future) in enumerate(batch):
+                        audio_future = self._synthesize(future, index) if self.audio else None
+                        window.append((key, text, extra, future, index, emotion_future, audio_future))
+                    batch.clear()
+
+            for key, text, extra in READERS[suffix](path):
+                if key in done:
+                    self.skipped += 1
+                    continue
+                if text is None:
+                    # Unreadable input line: journaled as failed, in order with the rest
+                    submit_batch()
+                    window.append((key, text, None, _failed(ValueError(extra['error'])), 0, None, None))
+                    continue
+                emotion_future = self._classify(text) if self.emotion else None
+                batch.append((key, text, extra, emotion_future))
+                if len(batch) >= BATCH_LINES:
+                    submit_batch()
+                    drain(self.workers * WINDOW_PER_WORKER)
+            submit_batch()
+            drain(0)
+
+        self._write_output(path, suffix, base, done)
+
+    def _write_output(self, path, suffix, base, done):
+        output_path = base + suffix
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.writelines(self._output_lines(path, suffix, done))
+        os.replace(tmp_path, output_path)
+
+    # Untranslated (failed) lines are written through as-is so the output stays aligned
+    def _output_lines(self, path, suffix, done):
+        if suffix == '.txt':
+            # Rebuilt from the raw lines so blank lines survive
+            with open(path, encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    record = done.get(str(line_no))
+                    yield (record['translation'] if record else line.rstrip('\r\n')) + '\n'
+            return
+        for key, text, extra in READERS[suffix](path):
+            if text is None:
+                yield extra['raw'] + '\n'
+                continue
+            record = done.get(key)
+            translated = record['translation'] if record else text
+            if suffix == '.srt':
+                yield f"{key}\n{extra}\n{translated}\n\n"
+            else:
+                row = dict(extra)
+                row['translation'] = translated
+                for field in ('emotion', 'emotion_score', 'emotion_error', 'audio', 'audio_error'):
+                    if record and field in record:
+                        row[field] = record[field]
+                yield json.dumps(row, ensure_ascii=False) + '\n'
+
+    def _count(self):
+        self.lines += 1
+        metrics.inc('batch_lines_total')
+        if self.lines % REPORT_EVERY_LINES == 0:
+            print(f"{self.lines} lines, {self.lines_per_second():.1f} lines/s", file=sys.stderr)
+
+    def lines_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.lines / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate every .txt, .srt and .jsonl file in a directory")
+    parser.add_argument('input_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--src', default='auto')
+    parser.add_argument('--dest', required=True)
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    parser.add_argument('--emotion', action='store_true', help="label each source line's emotion")
+    parser.add_argument('--audio', action='store_true', help="synthesize speech for each translated line")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    batch = BatchTranslator(args.src, args.dest, args.workers, args.emotion, args.audio)
+    for path in iter_input_files(args.input_dir):
+        print(f"Translating {path}", file=sys.stderr)
+        batch.translate_file(path, args.output_dir)
+    print(f"{batch.lines} lines translated ({batch.skipped} already done, {batch.errors} failed) "
+          f"at {batch.lines_per_second():.1f} lines/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from core import PROJECT_DIR
+
+DEFAULT_WAV_FIXTURES = (os.path.join(PROJECT_DIR, 'temp_translated_audio.wav'),)
+DEFAULT_TARGET = 'te'
+# A run is a regression if a stage's p95 grows by more than this over the baseline
+REGRESSION_TOLERANCE = 0.10
+
+
+class StandIn:
+    """Local replacement for a network service: fixed latency with jitter and a random error rate."""
+
+    def __init__(self, name, latency_ms, error_rate, jitter=0.2, seed=0):
+        self.name = name
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, scale=1.0):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency * scale * (1 + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{self.name}: 429 Too Many Requests")
+
+
+class _Translation:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubTranslator:
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+
+    def translate(self, text, src='auto', dest='en'):
+        if isinstance(text, list):
+            return [self.translate(item, src, dest) for item in text]
+        self.stand_in()
+        return _Translation(f"[{dest}] {text}")
+
+
+class StubRecognizer:
+    def __init__(self, stand_in, transcript):
+        self.stand_in = stand_in
+        self.transcript = transcript
+
+    def recognize_google(self, audio, language=None):
+        # Google's latency grows with the length of the upload
+        self.stand_in(scale=len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
+        return self.transcript
+
+
+def _stub_classifier(stand_in):
+    def classify(texts, **kwargs):
+        stand_in(scale=len(texts) ** 0.5)  # Batches amortize, roughly
+        return [[{'label': 'joy', 'score': 0.9}, {'label': 'sadness', 'score': 0.1}] for _ in texts]
+    return classify
+
+
+# Swap every network dependency for a local stand-in; the rest of the stack is the real code
+def install_stand_ins(args):
+    from core import asr_engines
+    from core import speech_output
+    from core import translation
+    from core.metrics import metrics
+    from core.translation_engines import RemoteEngine
+    from core.upstream import get_upstream
+
+    stand_ins = {
+        'translate': StandIn('translate', args.translate_ms, args.error_rate, seed=args.seed),
+        'gtts': StandIn('gtts', args.tts_ms, args.error_rate, seed=args.seed + 1),
+        'google_speech': StandIn('google_speech', args.asr_ms, args.error_rate, seed=args.seed + 2),
+    }
+    translator = StubTranslator(stand_ins['translate'])
+    router = translation.get_router()
+    router.engines['remote'] = RemoteEngine(lambda: translator)
+    # No fallback to the real NLLB engine: once the stand-in's retries run out the item
+    # fails, rather than loading a model (or downloading one) inside the timed stage
+    router.engines.pop('local', None)
+
+    def stub_mp3(text, language_code, voice):
+        def request():
+            stand_ins['gtts'](scale=max(1.0, len(text) / 100))
+            return b'ID3' + text.encode('utf-8')
+        with metrics.span('tts_synthesis', lang=language_code, chars=len(text)):
+            return get_upstream('gtts').call(request)
+    speech_output._gtts_mp3 = stub_mp3
+
+    recognizer = StubRecognizer(stand_ins['google_speech'], args.transcript)
+    asr_engines._engines['google'] = asr_engines.GoogleASR(lambda: recognizer)
+
+    if not args.translation_memory:
+        # The default corpus and transcript are phrasebook phrases; an empty memory keeps
+        # them from being answered there, so the translate stage measures translation
+        from core import translation_memory
+        translation_memory._memory = translation_memory.TranslationMemory()
+    return stand_ins
+
+
+def load_emotion(args):
+    from core.emotion_engine import EmotionEngine, get_emotion_engine
+    if not args.stub_emotion:
+        try:
+            return get_emotion_engine(), 'model'
+        except Exception as e:
+            print(f"Emotion model unavailable ({e}); using a stand-in", file=sys.stderr)
+    return EmotionEngine(_stub_classifier(StandIn('emotion', args.emotion_ms, 0.0, seed=args.seed + 3))), 'stand-in'
+
+
+def load_corpus(path=None):
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    from core.emotion_engine import EVAL_SENTENCES
+    from core.phrasebook import load_pairs
+    return list(EVAL_SENTENCES) + [meaning for _, meaning in load_pairs()]
+
+
+def load_wav_fixtures(paths):
+    import speech_recognition as sr
+    fixtures = []
+    for path in paths:
+        with wave.open(path, 'rb') as f:
+            fixtures.append(sr.AudioData(f.readframes(f.getnframes()), f.getframerate(), f.getsampwidth()))
+    return fixtures
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def run(self, stage, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            with self._lock:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self.samples.setdefault(stage, []).append(seconds)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows has no getrusage
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# The same stages, in the same order, as handle_text_input
+def text_item(timer, classifier, text, target_lang):
+    from core import speech_output
+    from core import translation
+    source_lang = timer.run('detect', translation.detect_language, text)
+    translated = timer.run('translate', translation.translate_long_text, text, source_lang, target_lang)
+    timer.run('emotion', classifier.classify_many, [text, translated])
+    timer.run('tts', speech_output.synthesize_to_path, translated, target_lang)
+
+
+# handle_speech_input: recognize first, then the text stages
+def speech_item(timer, classifier, audio, target_lang):
+    from core import asr_engines
+    spoken = timer.run('recognize', asr_engines.recognize, audio, 'en')
+    text_item(timer, classifier, spoken, target_lang)
+
+
+def run_benchmark(args):
+    stand_ins = install_stand_ins(args)
+    classifier, emotion_backend = load_emotion(args)
+    corpus = load_corpus(args.corpus)
+    fixtures = load_wav_fixtures(args.wav)
+    timer = StageTimer()
+
+    items = []
+    for _ in range(args.iterations):
+        items.extend((text_item, text) for text in corpus)
+        items.extend((speech_item, audio) for audio in fixtures)
+
+    failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(func, timer, classifier, payload, args.target) for func, payload in items]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                failed += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'config': {
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'target': args.target,
+            'error_rate': args.error_rate,
+            'latency_ms': {'translate': args.translate_ms, 'gtts': args.tts_ms, 'google_speech': args.asr_ms},
+            'emotion': emotion_backend,
+            'corpus_items': len(corpus),
+            'wav_fixtures': len(fixtures),
+        },
+        'items': len(items),
+        'failed_items': failed,
+        'seconds': elapsed,
+        'items_per_second': len(items) / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'upstream_calls': {name: stand_in.calls for name, stand_in in stand_ins.items()},
+        'stages': {
+            stage: {
+                'count': len(samples),
+                'errors': timer.errors.get(stage, 0),
+                'p50_ms': percentile(samples, 0.50) * 1000,
+                'p95_ms': percentile(samples, 0.95) * 1000,
+                'p99_ms': percentile(samples, 0.99) * 1000,
+            }
+            for stage, samples in timer.samples.items()
+        },
+    }
+
+
+def compare(results, baseline):
+    regressions = []
+    for stage, current in results['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if before and before['p95_ms'] and current['p95_ms'] > before['p95_ms'] * (1 + REGRESSION_TOLERANCE):
+            regressions.append(f"{stage}: p95 {before['p95_ms']:.1f} ms -> {current['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a fixed corpus through the app's stages against local stand-ins")
+    parser.add_argument('--corpus', help="one sentence per line; defaults to the emotion eval set and phrasebook")
+    parser.add_argument('--wav', nargs='*', default=list(DEFAULT_WAV_FIXTURES))
+    parser.add_argument('--transcript', default="Will it go to Pune?", help="what the ASR stand-in hears")
+    parser.add_argument('--target', default=DEFAULT_TARGET)
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--translate-ms', type=float, default=150)
+    parser.add_argument('--tts-ms', type=float, default=250)
+    parser.add_argument('--asr-ms', type=float, default=400, help="per second of audio")
+    parser.add_argument('--emotion-ms', type=float, default=20, help="stand-in only")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stub-emotion', action='store_true', help="don't load the emotion model")
+    parser.add_argument('--warm-caches', action='store_true', help="keep the real caches instead of starting empty")
+    parser.add_argument('--translation-memory', action='store_true',
+                        help="answer phrasebook phrases from translation memory instead of the translator")
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--baseline', help="JSON from an earlier run; exit 1 if any stage's p95 regressed")
+    args = parser.parse_args()
+
+    if not args.warm_caches:
+        # Cold caches every run so results are comparable; set before the app modules read them
+        scratch = tempfile.mkdtemp(prefix='benchmark-')
+        os.environ['TRANSLATION_CACHE_PATH'] = os.path.join(scratch, 'translation_cache.sqlite3')
+        os.environ['AUDIO_CACHE_DIR'] = os.path.join(scratch, 'audio_cache')
+        os.environ['TRANSLATION_MEMORY_PATH'] = os.path.join(scratch, 'translation_memory.jsonl')
+
+    results = run_benchmark(args)
+    print(f"{results['items']} items in {results['seconds']:.2f}s "
+          f"({results['items_per_second']:.1f} items/s, {results['failed_items']} failed), "
+          f"peak RSS {results['peak_rss_mb'] or 0:.0f} MB")
+    for stage, stats in sorted(results['stages'].items()):
+        print(f"  {stage:>10}: p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  "
+              f"p99 {stats['p99_ms']:8.1f} ms  ({stats['count']} calls, {stats['errors']} errors)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
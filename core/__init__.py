@@ -0,0 +1,4 @@
+import os
+
+# Data files (phrasebook pages, caches, models, fixtures) live next to the entry-point scripts
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
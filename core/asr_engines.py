@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import threading
+import time
+import wave
+
+from core import PROJECT_DIR
+from core.audio_buffer import AudioBuffer
+from core.cpu_pool import get_cpu_pool
+from core.metrics import metrics
+from core.upstream import CircuitOpenError, get_upstream
+
+# google (network), vosk (local Kaldi models) or whisper (local, multilingual)
+ASR_BACKEND = os.environ.get('ASR_BACKEND', 'google')
+# Local engine to use while Google is rate-limiting us or unreachable
+ASR_FALLBACK = os.environ.get('ASR_FALLBACK', 'vosk')
+# One Vosk model directory per language code, e.g. vosk_models/hi, vosk_models/te
+VOSK_MODEL_DIR = os.environ.get('VOSK_MODEL_DIR', os.path.join(PROJECT_DIR, 'vosk_models'))
+WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'openai/whisper-tiny')
+# Whisper has no incremental decoder; re-decode the buffer this often for a partial
+WHISPER_PARTIAL_SECONDS = 1.0
+CHUNK_SECONDS = 0.25
+
+# Google wants a locale; Indian English matches what take_command has always sent
+GOOGLE_LOCALES = {
+    'en': 'en-IN', 'hi': 'hi-IN', 'ta': 'ta-IN', 'te': 'te-IN', 'bn': 'bn-IN', 'mr': 'mr-IN',
+    'gu': 'gu-IN', 'pa': 'pa-Guru-IN', 'ml': 'ml-IN', 'kn': 'kn-IN', 'or': 'or-IN', 'ur': 'ur-IN',
+}
+
+
+class ASRStream:
+    """Incremental recognition: feed PCM chunks, read partial hypotheses, finish for the final text."""
+
+    def accept(self, chunk):
+        raise NotImplementedError
+
+    def finish(self):
+        raise NotImplementedError
+
+
+class ASREngine:
+    name = 'engine'
+
+    def supports(self, language):
+        return True
+
+    def stream(self, language, sample_rate, sample_width):
+        raise NotImplementedError
+
+    # Whole-utterance recognition of a speech_recognition AudioData
+    def recognize(self, audio, language):
+        stream = self.stream(language, audio.sample_rate, audio.sample_width)
+        stream.accept(audio.frame_data)
+        return stream.finish()
+
+
+# Decoders get a view of the buffer, never a copy of it
+class _BufferedStream(ASRStream):
+    def __init__(self, decode, sample_rate, sample_width, partial_seconds=None):
+        self.decode = decode
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.partial_bytes = int(partial_seconds * sample_rate * sample_width) if partial_seconds else None
+        self._buffer = AudioBuffer()
+        self._decoded_at = 0
+        self.partial = ""
+
+    def accept(self, chunk):
+        self._buffer.append(chunk)
+        if self.partial_bytes and len(self._buffer) - self._decoded_at >= self.partial_bytes:
+            self._decoded_at = len(self._buffer)
+            self.partial = self.decode(self._buffer.view(), self.sample_rate, self.sample_width)
+        return self.partial
+
+    def finish(self):
+        return self.decode(self._buffer.view(), self.sample_rate, self.sample_width)
+
+
+class _BufferedEngine(ASREngine):
+    """An engine that decodes whole buffers; ``_decode(language)`` returns the decoder."""
+
+    partial_seconds = None
+
+    def stream(self, language, sample_rate, sample_width):
+        return _BufferedStream(self._decode(language), sample_rate, sample_width, self.partial_seconds)
+
+    # A finished recording is decoded in place, with no stream buffer in between
+    def recognize(self, audio, language):
+        return self._decode(language)(audio.frame_data, audio.sample_rate, audio.sample_width)
+
+
+class GoogleASR(_BufferedEngine):
+    """The existing recognize_google path; buffers the whole utterance, no partials."""
+
+    name = 'google'
+
+    def __init__(self, get_recognizer):
+        self.get_recognizer = get_recognizer
+
+    def _decode(self, language):
+        import speech_recognition as sr
+
+        def decode(pcm, sample_rate, sample_width):
+            try:
+                return get_upstream('google_speech').call(
+                    self.get_recognizer().recognize_google,
+                    sr.AudioData(pcm, sample_rate, sample_width),
+                    language=GOOGLE_LOCALES.get(language, language),
+                    give_up_on=(sr.UnknownValueError,),
+                )
+            except sr.UnknownValueError:
+                return ""
+        return decode
+
+
+class _VoskStream(ASRStream):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._final = []
+
+    def accept(self, chunk):
+        if self.recognizer.AcceptWaveform(bytes(chunk)):
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self._final.append(text)
+            return " ".join(self._final)
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return " ".join(self._final + [partial]).strip()
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        return " ".join(self._final + [text]).strip()
+
+
+class VoskASR(ASREngine):
+    """Offline Kaldi recognition, one model per language loaded once per process."""
+
+    name = 'vosk'
+    _models = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_dir=VOSK_MODEL_DIR):
+        self.model_dir = model_dir
+
+    def supports(self, language):
+        return os.path.isdir(os.path.join(self.model_dir, language))
+
+    def model(self, language):
+        with self._lock:
+            model = self._models.get(language)
+            if model is None:
+                from vosk import Model, SetLogLevel
+                SetLogLevel(-1)
+                with metrics.span('asr_model_load', engine=self.name, language=language):
+                    model = self._models[language] = Model(os.path.join(self.model_dir, language))
+            return model
+
+    def stream(self, language, sample_rate, sample_width):
+        from vosk import KaldiRecognizer
+        if sample_width != 2:
+            raise ValueError("Vosk needs 16-bit PCM")
+        recognizer = KaldiRecognizer(self.model(language), sample_rate)
+        recognizer.SetWords(False)
+        return _VoskStream(recognizer)
+
+
+class WhisperASR(_BufferedEngine):
+    """Whisper through the transformers ASR pipeline, loaded once per process."""
+
+    name = 'whisper'
+    partial_seconds = WHISPER_PARTIAL_SECONDS
+    _pipeline = None
+    _lock = threading.Lock()
+
+    def __init__(self, model_name=WHISPER_MODEL):
+        self.model_name = model_name
+
+    def load(self):
+        cls = type(self)
+        with cls._lock:
+            if cls._pipeline is None:
+                from transformers import pipeline
+                with metrics.span('asr_model_load', engine=self.name):
+                    cls._pipeline = pipeline("automatic-speech-recognition", model=self.model_name, device='cpu')
+            return cls._pipeline
+
+    def _decode(self, language):
+        import numpy as np
+
+        def decode(pcm, sample_rate, sample_width):
+            if sample_width != 2:
+                raise ValueError("Whisper adapter expects 16-bit PCM")
+            pool = get_cpu_pool('whisper')
+            if pool is not None:
+                return pool.transcribe(pcm, sample_rate, language)
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            result = self.load()(
+                {'raw': samples, 'sampling_rate': sample_rate},
+                generate_kwargs={'language': language, 'task': 'transcribe'},
+            )
+            return result['text'].strip()
+        return decode
+
+
+def _recognizer():
+    from core.components import registry
+    return registry.get('recognizer')
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name):
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            factories = {'google': lambda: GoogleASR(_recognizer), 'vosk': VoskASR, 'whisper': WhisperASR}
+            engine = _engines[name] = factories[name]()
+        return engine
+
+
+# The configured backend for this language, or Google when it has no model for it
+def get_asr_engine(language, backend=None):
+    engine = get_engine(backend or ASR_BACKEND)
+    if not engine.supports(language):
+        return get_engine('google')
+    return engine
+
+
+# Same contract as recognize_google: UnknownValueError when nothing intelligible was said
+def recognize(audio, language):
+    import speech_recognition as sr
+
+    engine = get_asr_engine(language)
+    try:
+        with metrics.span('recognize', engine=engine.name, language=language):
+            text = engine.recognize(audio, language)
+    except CircuitOpenError:
+        fallback = get_engine(ASR_FALLBACK)
+        if fallback is engine or not fallback.supports(language):
+            raise
+        with metrics.span('recognize', engine=fallback.name, language=language):
+            text = fallback.recognize(audio, language)
+    if not text:
+        raise sr.UnknownValueError()
+    return text
+
+
+def read_wav(path):
+    with wave.open(path, 'rb') as f:
+        if f.getnchannels() != 1:
+            raise ValueError(f"{path}: expected mono audio")
+        return f.readframes(f.getnframes()), f.getframerate(), f.getsampwidth()
+
+
+# Feed a recording through each engine in real-time-sized chunks and measure how fast it keeps up
+def measure_real_time_factor(engine, pcm, sample_rate, sample_width, language, chunk_seconds=CHUNK_SECONDS):
+    audio_seconds = len(pcm) / (sample_rate * sample_width)
+    chunk_bytes = int(chunk_seconds * sample_rate) * sample_width
+    partials = 0
+    started = time.perf_counter()
+    stream = engine.stream(language, sample_rate, sample_width)
+    first_partial = None
+    for offset in range(0, len(pcm), chunk_bytes):
+        if stream.accept(pcm[offset:offset + chunk_bytes]):
+            partials += 1
+            if first_partial is None:
+                first_partial = time.perf_counter() - started
+    text = stream.finish()
+    seconds = time.perf_counter() - started
+    return {
+        'text': text,
+        'seconds': seconds,
+        'audio_seconds': audio_seconds,
+        'real_time_factor': seconds / audio_seconds,
+        'partials': partials,
+        'first_partial_seconds': first_partial,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speech recognition backends on a recording")
+    parser.add_argument('wav', nargs='?', default=os.path.join(PROJECT_DIR, 'temp_translated_audio.wav'))
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--engines', default='google,vosk,whisper')
+    args = parser.parse_args()
+
+    pcm, sample_rate, sample_width = read_wav(args.wav)
+    for name in args.engines.split(','):
+        engine = get_engine(name)
+        if not engine.supports(args.lang):
+            print(f"{name:>8}: no model for {args.lang}")
+            continue
+        try:
+            if isinstance(engine, VoskASR):
+                engine.model(args.lang)  # Load time is a startup cost, not part of the factor
+            elif isinstance(engine, WhisperASR):
+                engine.load()
+            report = measure_real_time_factor(engine, pcm, sample_rate, sample_width, args.lang)
+        except Exception as e:
+            print(f"{name:>8}: {str(e)}")
+            continue
+        print(f"{name:>8}: RTF {report['real_time_factor']:.2f} "
+              f"({report['seconds']:.2f}s for {report['audio_seconds']:.2f}s of audio, "
+              f"{report['partials']} partials) {report['text']!r}")
+
+
+if __name__ == '__main__':
+    main()
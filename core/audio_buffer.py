@@ -0,0 +1,120 @@
+import io
+import mmap
+import os
+
+DEFAULT_CAPACITY = 64 * 1024
+
+
+class AudioBuffer:
+    """Append-only byte buffer that hands out memoryviews instead of copies.
+
+    Capture appends PCM frames, gTTS writes MP3 into it like a file, and ASR,
+    playback and HTTP read it through ``view``. Growing allocates a fresh
+    bytearray rather than resizing in place, so a view taken earlier stays
+    valid and keeps showing exactly the bytes it was taken over.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._data = bytearray(max(1, capacity))
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, chunk):
+        chunk = memoryview(chunk).cast('B')
+        end = self._length + len(chunk)
+        if end > len(self._data):
+            grown = bytearray(max(end, 2 * len(self._data)))
+            grown[:self._length] = memoryview(self._data)[:self._length]
+            self._data = grown
+        self._data[self._length:end] = chunk
+        self._length = end
+
+    # File-like, so writers such as gTTS.write_to_fp can fill it directly
+    def write(self, chunk):
+        self.append(chunk)
+        return len(chunk)
+
+    def view(self, start=0, end=None):
+        end = self._length if end is None else min(end, self._length)
+        return memoryview(self._data)[start:end].toreadonly()
+
+
+class RingBuffer:
+    """Fixed-size byte ring keeping only the most recent ``capacity`` bytes."""
+
+    def __init__(self, capacity):
+        self._data = bytearray(max(1, capacity))
+        self._start = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def write(self, chunk):
+        chunk = memoryview(chunk).cast('B')
+        capacity = len(self._data)
+        if len(chunk) >= capacity:
+            self._data[:] = chunk[len(chunk) - capacity:]
+            self._start, self._length = 0, capacity
+            return
+        end = (self._start + self._length) % capacity
+        first = min(len(chunk), capacity - end)
+        self._data[end:end + first] = chunk[:first]
+        self._data[:len(chunk) - first] = chunk[first:]
+        overflow = max(0, self._length + len(chunk) - capacity)
+        self._start = (self._start + overflow) % capacity
+        self._length = min(capacity, self._length + len(chunk))
+
+    # Oldest bytes first, as at most two views of the ring
+    def views(self):
+        data = memoryview(self._data)
+        end = self._start + self._length
+        if end <= len(self._data):
+            return [data[self._start:end]]
+        return [data[self._start:], data[:end - len(self._data)]]
+
+    def drain_into(self, buffer):
+        for view in self.views():
+            buffer.append(view)
+        self.clear()
+
+    def clear(self):
+        self._start = self._length = 0
+
+
+class ViewReader(io.RawIOBase):
+    """Seekable binary file over a buffer, for APIs that want a file (pygame, st.audio)."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+# Read-only view of a file's pages; the mapping lives as long as the view does
+def map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b'')
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import PROJECT_DIR
+from core.audio_buffer import map_file
+
+DEFAULT_AUDIO_CACHE_DIR = os.environ.get('AUDIO_CACHE_DIR', os.path.join(PROJECT_DIR, 'audio_cache'))
+DEFAULT_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+# gTTS picks its accent from the Google domain it talks to
+DEFAULT_VOICE = 'com'
+
+
+def audio_key(text, language_code, voice=DEFAULT_VOICE):
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{voice}\0{language_code}\0{normalized}".encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed MP3 store on disk, LRU-evicted by modification time.
+
+    Files live at ``<dir>/<key[:2]>/<key>.mp3`` where the key hashes
+    (voice, language, normalized text). A hit touches the file so eviction
+    removes the least recently played audio first.
+    """
+
+    def __init__(self, directory=DEFAULT_AUDIO_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], key + '.mp3')
+
+    def get_path(self, text, language_code, voice=DEFAULT_VOICE):
+        path = self.path_for(audio_key(text, language_code, voice))
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    # Memory-mapped rather than read, so a hit costs no copy. On Windows a mapped
+    # file can't be evicted; evict() skips it and gets it on a later pass.
+    def get(self, text, language_code, voice=DEFAULT_VOICE):
+        path = self.get_path(text, language_code, voice)
+        if path is None:
+            return None
+        try:
+            return map_file(path)
+        except OSError:
+            return None  # Evicted by another process between the touch and the read
+
+    def put(self, text, language_code, data, voice=DEFAULT_VOICE):
+        path = self.path_for(audio_key(text, language_code, voice))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers in other processes never see half a file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data)
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = total
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.mp3'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def stats(self):
+        with self._lock:
+            return {
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
+
+
+# Synthesize every (text, language) pair that isn't cached yet
+def warm_up(phrases, workers=4):
+    from core.speech_output import synthesize
+
+    cache = get_audio_cache()
+    missing = [(text, lang) for text, lang in phrases if cache.get_path(text, lang) is None]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda phrase: synthesize(*phrase), missing))
+    return len(missing)
+
+
+def main():
+    from core.phrasebook import RICKSHAW_PHRASEBOOK, TELUGU_HUB, load_pairs, load_telugu_phrases
+
+    parser = argparse.ArgumentParser(description="Inspect or pre-warm the TTS audio cache")
+    parser.add_argument('--warm', action='store_true',
+                        help="synthesize the phrases in telrickshaw.html and telugu.html")
+    args = parser.parse_args()
+
+    if args.warm:
+        # The rickshaw sentences are romanized Telugu, so only their meanings are spoken
+        phrases = [(meaning, 'en') for _, meaning in load_pairs(RICKSHAW_PHRASEBOOK)]
+        phrases.extend((text, 'te') for text in load_telugu_phrases(TELUGU_HUB))
+        started = time.perf_counter()
+        synthesized = warm_up(phrases)
+        print(f"Synthesized {synthesized} of {len(phrases)} phrases in {time.perf_counter() - started:.1f}s")
+    print(get_audio_cache().stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from core.metrics import metrics
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ComponentRegistry:
+    """Builds each backend on first use and remembers it for the process.
+
+    Factories do their own imports, so nothing heavy is loaded until a
+    component is asked for. ``warm`` builds components on a background thread
+    and ``status`` reports where each one is.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._status = {}
+        self._errors = {}
+        self._load_seconds = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._warming = set()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._status[name] = PENDING
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        if self._status.get(name) == READY:
+            return self._instances[name]
+        # One thread builds; any other caller blocks on the same lock until it's done
+        with self._locks[name]:
+            if self._status[name] == READY:
+                return self._instances[name]
+            self._status[name] = LOADING
+            started = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = e
+                self._status[name] = FAILED
+                raise
+            self._load_seconds[name] = time.perf_counter() - started
+            metrics.record_startup(f'component_{name}', self._load_seconds[name])
+            self._instances[name] = instance
+            self._errors.pop(name, None)
+            self._status[name] = READY
+            return instance
+
+    def is_ready(self, name):
+        return self._status.get(name) == READY
+
+    # Start building the named components in the background; safe to call on every rerun
+    def warm(self, *names):
+        with self._lock:
+            names = [name for name in names if name not in self._warming]
+            self._warming.update(names)
+        if not names:
+            return None
+        thread = threading.Thread(target=self._warm, args=(names,), name="component-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm(self, names):
+        for name in names:
+            try:
+                self.get(name)
+            except Exception:
+                pass  # Recorded in status(); the next get() retries
+
+    def status(self):
+        with self._lock:
+            names = list(self._factories)
+        return {
+            name: {
+                'status': self._status[name],
+                'load_seconds': self._load_seconds.get(name),
+                'error': str(self._errors[name]) if name in self._errors else None,
+            }
+            for name in names
+        }
+
+
+# Classify through the host's model server; without one, load the model here so warm-up still pays off
+def _emotion_classifier():
+    from core.model_server import get_emotion_client
+    client = get_emotion_client()
+    if not client.server_available():
+        from core.emotion_engine import get_emotion_engine
+        get_emotion_engine()
+    return client
+
+
+def _tts_engine():
+    import pyttsx3
+    engine = pyttsx3.init('sapi5')
+    voices = engine.getProperty('voices')
+    engine.setProperty('voice', voices[1].id)  # Set to female voice
+    return engine
+
+
+def _recognizer():
+    import speech_recognition as sr
+    return sr.Recognizer()
+
+
+def _mixer():
+    import pygame
+    pygame.mixer.init()
+    return pygame.mixer
+
+
+def _translator():
+    from core.translation import get_translator
+    return get_translator()
+
+
+registry = ComponentRegistry()
+registry.register('emotion_classifier', _emotion_classifier)
+registry.register('tts_engine', _tts_engine)
+registry.register('recognizer', _recognizer)
+registry.register('mixer', _mixer)
+registry.register('translator', _translator)
@@ -0,0 +1,241 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from multiprocessing.shared_memory import SharedMemory
+
+from core.metrics import metrics
+
+
+# "auto" scales to the host's cores; otherwise a fixed count
+def parse_workers(value):
+    if value.strip().lower() == 'auto':
+        return os.cpu_count() or 1
+    return int(value)
+
+
+# Worker processes for the GIL-bound stages. Opt-in: each worker holds its own copy of
+# the models it uses, so the default 0 keeps every stage in-process (one model per host)
+CPU_WORKERS = parse_workers(os.environ.get('CPU_WORKERS', '0'))
+# Which stages go to the pool: emotion (tokenized batches), detect (langdetect), whisper (PCM decode)
+CPU_POOL_STAGES = set(filter(None, os.environ.get('CPU_POOL_STAGES', 'emotion,detect,whisper').split(',')))
+
+# Per-worker state, filled by _init_worker and on first use
+_worker_models = {}
+
+
+# Payloads are copied once into a named block; the worker maps the same pages
+# instead of unpickling a copy. The submitting side owns and unlinks the block.
+@contextmanager
+def shared_array(array):
+    import numpy as np
+    shm = SharedMemory(create=True, size=max(1, array.nbytes))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        yield (shm.name, array.shape, array.dtype.str)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def shared_bytes(data):
+    shm = SharedMemory(create=True, size=max(1, len(data)))
+    try:
+        shm.buf[:len(data)] = data
+        yield (shm.name, len(data))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# Worker side. Views of a block must be gone before it closes, so they are only
+# ever passed straight into a call and never bound to a name that outlives it.
+@contextmanager
+def _attach(name):
+    shm = SharedMemory(name=name)
+    try:
+        yield shm
+    finally:
+        shm.close()
+
+
+def _array_view(shm, ref):
+    import numpy as np
+    _, shape, dtype = ref
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(preload):
+    for stage in preload:
+        try:
+            _worker_model(stage)
+        except Exception:
+            pass  # Retried, and reported, on first use
+
+
+def _worker_model(stage):
+    model = _worker_models.get(stage)
+    if model is None:
+        if stage == 'emotion':
+            import torch
+            from core.emotion_engine import EMOTION_BACKEND, load_emotion_classifier
+            torch.set_num_threads(1)  # The pool, not torch's intra-op threads, provides the parallelism
+            model = load_emotion_classifier(EMOTION_BACKEND).model
+        elif stage == 'detect':
+            from langdetect import detector_factory
+            detector_factory.init_factory()  # Loads the language profiles
+            model = detector_factory
+        elif stage == 'whisper':
+            from core.asr_engines import WhisperASR
+            model = WhisperASR().load()
+        else:
+            raise ValueError(f"Unknown CPU stage: {stage}")
+        _worker_models[stage] = model
+    return model
+
+
+def _emotion_probabilities(model, input_ids, attention_mask):
+    import torch
+    with torch.no_grad():
+        # from_numpy shares the mapped pages rather than copying them
+        logits = model(input_ids=torch.from_numpy(input_ids), attention_mask=torch.from_numpy(attention_mask)).logits
+    return torch.softmax(logits.float(), dim=-1).tolist()
+
+
+def _emotion_forward(ids_ref, mask_ref):
+    model = _worker_model('emotion')
+    with _attach(ids_ref[0]) as ids_block, _attach(mask_ref[0]) as mask_block:
+        probabilities = _emotion_probabilities(model, _array_view(ids_block, ids_ref), _array_view(mask_block, mask_ref))
+    labels = model.config.id2label
+    return [[{'label': labels[i], 'score': score} for i, score in enumerate(row)] for row in probabilities]
+
+
+# None when there is nothing to detect: LangDetectException can't be unpickled on the
+# calling side, and a result that fails to unpickle breaks the whole pool
+def _detect_language(text):
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+    _worker_model('detect')
+    try:
+        return detect(text)
+    except LangDetectException:
+        return None
+
+
+def _whisper_decode(pcm_ref, sample_rate, language):
+    import numpy as np
+    pipeline = _worker_model('whisper')
+    name, size = pcm_ref
+    with _attach(name) as block:
+        samples = np.frombuffer(block.buf, dtype=np.int16, count=size // 2).astype(np.float32) / 32768.0
+    result = pipeline({'raw': samples, 'sampling_rate': sample_rate},
+                      generate_kwargs={'language': language, 'task': 'transcribe'})
+    return result['text'].strip()
+
+
+class CpuPool:
+    """Process pool for the stages that hold the GIL in pure Python or torch.
+
+    Workers are spawned (not forked, so no thread or lock state is inherited),
+    preload only the model of the stage that first asked for the pool (others
+    load on first use), and receive token IDs and PCM through shared memory.
+    Callers block on the result from any thread, so a threaded caller keeps
+    every worker busy. If a worker dies the pool is rebuilt and the call is
+    retried once.
+    """
+
+    def __init__(self, workers=CPU_WORKERS, stages=CPU_POOL_STAGES, preload=()):
+        self.workers = workers
+        self.stages = set(stages)
+        self.preload = [stage for stage in preload if stage in self.stages]
+        self._executor = self._new_executor()
+        self._executor_lock = threading.Lock()
+        self._tokenizer = None
+        self._tokenizer_lock = threading.Lock()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.preload,),
+        )
+
+    # A killed worker breaks the whole executor for good; swap in a fresh one, once per breakage
+    def _replace(self, broken):
+        with self._executor_lock:
+            if self._executor is broken:
+                metrics.inc('cpu_pool_restarts_total')
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+
+    def _retrying(self, run):
+        executor = self._executor
+        try:
+            return run(executor)
+        except BrokenProcessPool:
+            self._replace(executor)
+            return run(self._executor)
+
+    def _call(self, stage, func, *args):
+        with metrics.span(f'cpu_pool_{stage}'):
+            return self._retrying(lambda executor: executor.submit(func, *args).result())
+
+    def tokenizer(self):
+        with self._tokenizer_lock:
+            if self._tokenizer is None:
+                from transformers import AutoTokenizer
+                from core.emotion_engine import EMOTION_MODEL
+                self._tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL, use_fast=True)
+            return self._tokenizer
+
+    # Same call and output shape as the transformers pipeline, so EmotionEngine can use it as its classifier.
+    # The batch is split across workers; the Rust tokenizer runs here without the GIL.
+    def classify_emotions(self, texts, top_k=None, batch_size=None, truncation=True):
+        texts = list(texts)
+        with metrics.span('cpu_pool_emotion', texts=len(texts)):
+            return self._retrying(lambda executor: self._classify_on(executor, texts, truncation))
+
+    def _classify_on(self, executor, texts, truncation):
+        per_worker = max(1, -(-len(texts) // self.workers))
+        with ExitStack() as blocks:
+            futures = []
+            try:
+                for start in range(0, len(texts), per_worker):
+                    encoded = self.tokenizer()(texts[start:start + per_worker], padding=True,
+                                               truncation=truncation, return_tensors='np')
+                    ids = blocks.enter_context(shared_array(encoded['input_ids']))
+                    mask = blocks.enter_context(shared_array(encoded['attention_mask']))
+                    futures.append(executor.submit(_emotion_forward, ids, mask))
+                return [scores for future in futures for scores in future.result()]
+            finally:
+                wait(futures)  # A block must outlive the worker reading it
+
+    def detect_language(self, text):
+        return self._call('detect', _detect_language, text)
+
+    def transcribe(self, pcm, sample_rate, language):
+        with shared_bytes(pcm) as ref:
+            return self._call('whisper', _whisper_decode, ref, sample_rate, language)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# The shared pool, or None when CPU_WORKERS=0 or the stage is kept in-process.
+# Workers preload the model of the stage that created the pool, not every stage's.
+def get_cpu_pool(stage=None):
+    global _pool
+    if CPU_WORKERS <= 0 or (stage is not None and stage not in CPU_POOL_STAGES):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = CpuPool(preload=[stage] if stage else ())
+        return _pool
@@ -0,0 +1,273 @@
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core import PROJECT_DIR
+from core.metrics import metrics
+
+EMOTION_MODEL = "bhadresh-savani/distilbert-base-uncased-emotion"
+# fp32 (the plain pipeline), int8 (dynamic quantization of the Linear layers) or onnx (ONNX Runtime)
+EMOTION_BACKEND = os.environ.get('EMOTION_BACKEND', 'fp32')
+EMOTION_ONNX_DIR = os.environ.get('EMOTION_ONNX_DIR', os.path.join(PROJECT_DIR, 'emotion_model_onnx'))
+# A backend may replace fp32 only if it picks the same top emotion this often on the eval set
+MIN_LABEL_AGREEMENT = 0.98
+
+# Fixed eval set for --check: a few sentences per label, plus the phrasebook meanings
+EVAL_SENTENCES = (
+    "I am so happy to see you again!",
+    "This is the best day of my life.",
+    "We finally won the match, I can't stop smiling.",
+    "I feel so lonely and miserable today.",
+    "My grandmother passed away last night.",
+    "Nothing I do seems to matter anymore.",
+    "How dare you speak to me like that!",
+    "I am furious that they cancelled my ticket.",
+    "Stop overcharging me, this is a scam.",
+    "I am scared to walk home alone at night.",
+    "The driver is going too fast, I'm terrified.",
+    "I'm nervous about the exam tomorrow.",
+    "I love you more than anything.",
+    "She held my hand and I felt so cared for.",
+    "Wow, I never expected that to happen!",
+    "I can't believe the rickshaw arrived so quickly.",
+)
+
+
+# The model is uncased, so case and repeated whitespace never change its output
+def normalize_text(text):
+    return " ".join(text.split()).lower()
+
+
+# Turn the pipeline's list of {label, score} dicts into (top_emotion, top_score, emotions)
+def summarize_scores(scores):
+    emotions = {item['label']: item['score'] for item in sorted(scores, key=lambda s: s['score'], reverse=True)}
+    if not emotions:
+        return "unknown", 0.0, {}
+    top_emotion = next(iter(emotions))
+    return top_emotion, emotions[top_emotion], emotions
+
+
+class EmotionEngine:
+    """Micro-batching front end for a transformers text-classification pipeline.
+
+    Texts submitted from any thread are collected for up to ``max_wait_ms`` (or
+    until ``max_batch_size`` are waiting), run through the model as one padded
+    batch, and answered with the full score distribution. Results are kept in a
+    bounded LRU keyed by normalized text. With ``concurrency`` above one, up to
+    that many batches are in the classifier at once (for a process-pool
+    classifier); otherwise batches run one after another on the worker thread.
+    """
+
+    def __init__(self, classifier, max_batch_size=16, max_wait_ms=10, cache_size=1024, concurrency=1):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.cache_size = cache_size
+        self._slots = threading.Semaphore(concurrency)
+        self._dispatch = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="emotion-batch") if concurrency > 1 else None
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="emotion-engine", daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        key = normalize_text(text)
+        enqueue = False
+        with self._lock:
+            hit = key in self._cache
+            if hit:
+                self._cache.move_to_end(key)
+                future = Future()
+                future.set_result(self._cache[key])
+            else:
+                # Identical texts already waiting for the model share one slot in the batch
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._pending[key] = Future()
+                    enqueue = True
+        metrics.cache_lookup('emotion', hit)
+        if enqueue:
+            self._queue.put((key, future))
+        return future
+
+    def classify(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def classify_many(self, texts, timeout=None):
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if self._dispatch is None:
+                self._process(batch)
+                continue
+            # Keep collecting the next batch while this one is in flight, up to the slot limit
+            self._slots.acquire()
+            self._dispatch.submit(self._process_in_slot, batch)
+
+    def _process_in_slot(self, batch):
+        try:
+            self._process(batch)
+        finally:
+            self._slots.release()
+
+    def _process(self, batch):
+        texts = [key for key, _ in batch]
+        try:
+            with metrics.span('emotion_batch', batch_size=len(texts)):
+                outputs = self.classifier(texts, top_k=None, batch_size=len(texts), truncation=True)
+        except Exception as e:
+            with self._lock:
+                for key, _ in batch:
+                    self._pending.pop(key, None)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (key, future), scores in zip(batch, outputs):
+            result = summarize_scores(scores)
+            with self._lock:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self._pending.pop(key, None)
+            future.set_result(result)
+
+
+def load_emotion_classifier(backend=EMOTION_BACKEND):
+    from transformers import AutoTokenizer, pipeline
+
+    if backend == 'fp32':
+        return pipeline("text-classification", model=EMOTION_MODEL)
+    tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL, use_fast=True)
+    if backend == 'int8':
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+    if backend == 'onnx':
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        # Export once; later processes load the saved graph directly
+        if os.path.isdir(EMOTION_ONNX_DIR):
+            model = ORTModelForSequenceClassification.from_pretrained(EMOTION_ONNX_DIR)
+        else:
+            model = ORTModelForSequenceClassification.from_pretrained(EMOTION_MODEL, export=True)
+            model.save_pretrained(EMOTION_ONNX_DIR)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+    raise ValueError(f"Unknown emotion backend: {backend}")
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+# One engine per process for callers outside Streamlit's resource cache
+def get_emotion_engine():
+    from core.cpu_pool import get_cpu_pool
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            pool = get_cpu_pool('emotion')
+            if pool is not None:
+                # The model lives in the pool's workers; this process only tokenizes
+                pool.tokenizer()
+                _shared_engine = EmotionEngine(pool.classify_emotions, concurrency=pool.workers)
+            else:
+                with metrics.span('emotion_model_load', backend=EMOTION_BACKEND):
+                    _shared_engine = EmotionEngine(load_emotion_classifier(EMOTION_BACKEND))
+        return _shared_engine
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows has no getrusage
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _evaluate(classifier, texts):
+    started = time.perf_counter()
+    outputs = classifier(list(texts), top_k=None, batch_size=len(texts), truncation=True)
+    seconds = time.perf_counter() - started
+    return [summarize_scores(scores) for scores in outputs], seconds
+
+
+# Compare a backend against fp32 on the eval set: label agreement, score drift, latency
+def check_backend(backend, texts=EVAL_SENTENCES):
+    rss_before = _peak_rss_mb()
+    baseline = load_emotion_classifier('fp32')
+    rss_baseline = _peak_rss_mb()
+    candidate = load_emotion_classifier(backend)
+    rss_candidate = _peak_rss_mb()
+
+    _evaluate(baseline, texts[:2])  # Warm both up so the timings exclude first-call setup
+    _evaluate(candidate, texts[:2])
+    expected, baseline_seconds = _evaluate(baseline, texts)
+    actual, candidate_seconds = _evaluate(candidate, texts)
+
+    mismatches = [
+        (text, want[0], got[0])
+        for text, want, got in zip(texts, expected, actual)
+        if want[0] != got[0]
+    ]
+    max_drift = max(
+        abs(want[2][label] - got[2].get(label, 0.0))
+        for want, got in zip(expected, actual)
+        for label in want[2]
+    )
+    return {
+        'backend': backend,
+        'texts': len(texts),
+        'label_agreement': 1 - len(mismatches) / len(texts),
+        'max_score_drift': max_drift,
+        'mismatches': mismatches,
+        'fp32_seconds': baseline_seconds,
+        'backend_seconds': candidate_seconds,
+        # ru_maxrss only grows, so this is the peak added by each load, fp32 first
+        'fp32_load_mb': rss_baseline - rss_before,
+        'backend_load_mb': rss_candidate - rss_baseline,
+    }
+
+
+def main():
+    from core.phrasebook import load_pairs
+
+    parser = argparse.ArgumentParser(description="Check an optimized emotion backend against the fp32 model")
+    parser.add_argument('--check', default=EMOTION_BACKEND, choices=['int8', 'onnx'])
+    args = parser.parse_args()
+
+    texts = EVAL_SENTENCES + tuple(meaning for _, meaning in load_pairs())
+    report = check_backend(args.check, texts)
+    print(f"{report['backend']}: {report['label_agreement']:.1%} label agreement on {report['texts']} texts, "
+          f"max score drift {report['max_score_drift']:.4f}")
+    print(f"latency: fp32 {report['fp32_seconds'] * 1000:.1f} ms, "
+          f"{report['backend']} {report['backend_seconds'] * 1000:.1f} ms per batch")
+    print(f"peak RSS added by load: fp32 {report['fp32_load_mb']:.0f} MB, "
+          f"{report['backend']} {report['backend_load_mb']:.0f} MB")
+    for text, want, got in report['mismatches']:
+        print(f"  {want} -> {got}: {text}")
+    if report['label_agreement'] < MIN_LABEL_AGREEMENT:
+        raise SystemExit(f"{report['backend']} changes too many labels; keep EMOTION_BACKEND=fp32")
+
+
+if __name__ == '__main__':
+    main()
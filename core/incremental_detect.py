@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from langdetect import detector_factory
+from langdetect.utils.ngram import NGram
+
+# Same smoothing langdetect uses, minus its random restarts so updates are additive
+ALPHA = 0.5
+BASE_FREQ = 10000
+STABLE_CONFIDENCE = 0.99
+STABLE_UPDATES = 3
+# Naive Bayes is overconfident on a handful of characters, so require some evidence first
+MIN_STABLE_NGRAMS = 60
+MAX_SESSIONS = 1024
+SESSION_TTL_SECONDS = 30 * 60
+
+
+class DetectionSession:
+    """Running n-gram log-likelihoods for one input box.
+
+    Only characters appended since the last call are scored. Once the top
+    language has held ``STABLE_CONFIDENCE`` over at least ``MIN_STABLE_NGRAMS``
+    n-grams for ``STABLE_UPDATES`` calls, the session stops scoring until the
+    text is edited rather than extended.
+    """
+
+    def __init__(self, word_lang_prob_map, langlist):
+        self.word_lang_prob_map = word_lang_prob_map
+        self.langlist = langlist
+        self.reset()
+
+    def reset(self):
+        self.text = ''
+        self.ngram = NGram()
+        self.log_prob = [0.0] * len(self.langlist)
+        self.ngram_count = 0
+        self.language = 'en'
+        self.confidence = 0.0
+        self.stable_updates = 0
+        self.stable = False
+        self.last_used = time.monotonic()
+
+    def update(self, text):
+        self.last_used = time.monotonic()
+        if not text.startswith(self.text):
+            self.reset()
+        appended = text[len(self.text):]
+        self.text = text
+        if appended and not self.stable:
+            self._score(appended)
+            self._refresh()
+        return self.language, self.confidence, self.stable
+
+    def _score(self, appended):
+        weight = ALPHA / BASE_FREQ
+        for ch in appended:
+            self.ngram.add_char(ch)
+            for n in range(1, NGram.N_GRAM + 1):
+                word = self.ngram.get(n)
+                if not word or word == ' ':
+                    continue
+                lang_prob = self.word_lang_prob_map.get(word)
+                if lang_prob is None:
+                    continue
+                self.ngram_count += 1
+                for i, p in enumerate(lang_prob):
+                    self.log_prob[i] += math.log(weight + p)
+
+    def _refresh(self):
+        if not self.ngram_count:
+            return
+        best = max(range(len(self.log_prob)), key=self.log_prob.__getitem__)
+        top = self.log_prob[best]
+        total = sum(math.exp(lp - top) for lp in self.log_prob)
+        language, confidence = self.langlist[best], 1.0 / total
+        confident = confidence >= STABLE_CONFIDENCE and self.ngram_count >= MIN_STABLE_NGRAMS
+        if language == self.language and confident:
+            self.stable_updates += 1
+        else:
+            self.stable_updates = 0
+        self.language, self.confidence = language, confidence
+        self.stable = self.stable_updates >= STABLE_UPDATES
+
+
+class IncrementalDetector:
+    """Keeps one DetectionSession per client session id, LRU/idle bounded."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, session_ttl=SESSION_TTL_SECONDS):
+        detector_factory.init_factory()
+        factory = detector_factory._factory
+        self.word_lang_prob_map = factory.word_lang_prob_map
+        self.langlist = factory.langlist
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def detect(self, session_id, text):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                session = DetectionSession(self.word_lang_prob_map, self.langlist)
+            self._sessions[session_id] = session
+            self._evict()
+            return session.update(text)
+
+    def end_session(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.session_ttl
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and oldest.last_used >= cutoff:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import metrics, submit_with_context
+
+JOB_WORKERS = 4
+# Finished jobs are kept this long so a page rerun can still pick up its result
+JOB_TTL_SECONDS = 30 * 60
+MAX_FINISHED_JOBS = 200
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    """One unit of background work, with progress the UI can poll."""
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.finished = None
+        self.future = None
+
+    # partial is whatever is worth showing before the result, e.g. the sentences translated so far
+    def report(self, progress, message="", partial=None):
+        self.progress = min(1.0, max(0.0, progress))
+        self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """Runs jobs on a worker pool and remembers them by ID after they finish.
+
+    A Streamlit page keeps only the job ID in ``st.session_state``; reruns
+    look the job up here and render its progress or its finished result
+    instead of doing the work again on the script thread.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL_SECONDS, max_finished=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._ttl = ttl
+        self._max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # func is called as func(job, *args) and can call job.report(progress, message) as it goes
+    def submit(self, func, *args):
+        with self._lock:
+            self._expire()
+            job = Job(f"job-{next(self._ids)}")
+            self._jobs[job.id] = job
+        metrics.inc('jobs_submitted_total')
+        # Carry the caller's request ID so the job's spans line up with the click that started it
+        job.future = submit_with_context(self._executor, self._run, job, func, args)
+        return job.id
+
+    def _run(self, job, func, args):
+        job.status = RUNNING
+        try:
+            with metrics.span('job', name=getattr(func, '__name__', 'job')):
+                job.result = func(job, *args)
+            job.report(1.0, job.message)
+            job.finished = time.monotonic()
+            job.status = DONE
+        except Exception as e:
+            job.error = e
+            job.finished = time.monotonic()
+            job.status = FAILED
+            metrics.inc('jobs_failed_total')
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        job = self.get(job_id)
+        if job is not None and job.future is not None:
+            job.future.exception(timeout)
+        return job
+
+    # Drop finished jobs past their TTL, then the oldest finished ones over the cap
+    def _expire(self):
+        now = time.monotonic()
+        finished = [job for job in self._jobs.values() if job.done]
+        excess = len(finished) - self._max_finished
+        for job in finished:
+            if now - job.finished > self._ttl or excess > 0:
+                excess -= 1
+                del self._jobs[job.id]
+        metrics.set_gauge('jobs_retained', len(self._jobs))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
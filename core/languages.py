@@ -0,0 +1,28 @@
+# Language menus shared by every page; codes are what googletrans and gTTS expect
+MAJOR_LANGUAGES = {
+    "English": "en", "Hindi": "hi", "Tamil": "ta", "Telugu": "te", "Bengali": "bn",
+    "Marathi": "mr", "Gujarati": "gu", "Punjabi": "pa", "Malayalam": "ml", "Kannada": "kn",
+    "Odia": "or", "Urdu": "ur",
+}
+REGIONAL_LANGUAGES = {
+    "Assamese": "as", "Maithili": "mai", "Konkani": "kok", "Sanskrit": "sa", "Sindhi": "sd",
+    "Nepali": "ne", "Bhojpuri": "bho", "Rajasthani": "raj", "Kashmiri": "ks", "Santali": "sat",
+    "Dogri": "doi", "Manipuri": "mni", "Kundli": "ku", "Haryanvi": "hari",
+}
+WORLD_LANGUAGES = {
+    "Spanish": "es", "French": "fr", "German": "de", "Italian": "it", "Portuguese": "pt",
+    "Russian": "ru", "Japanese": "ja", "Korean": "ko",
+}
+
+INDIAN_LANGUAGES = {**MAJOR_LANGUAGES, **REGIONAL_LANGUAGES}
+# trail.py offers the major Indian languages alongside the common foreign ones
+MAJOR_AND_WORLD_LANGUAGES = {**MAJOR_LANGUAGES, **WORLD_LANGUAGES}
+
+
+def get_lang_name(lang_code):
+    try:
+        import pycountry
+        language = pycountry.languages.get(alpha_2=lang_code)
+        return language.name if language else "Unknown"
+    except Exception:
+        return "Unknown"
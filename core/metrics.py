@@ -0,0 +1,194 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cached lookup up to a slow upstream call
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TRACE_LOG_PATH = os.environ.get('TRACE_LOG_PATH')
+METRICS_TEXTFILE = os.environ.get('METRICS_TEXTFILE')
+TEXTFILE_INTERVAL_SECONDS = 10
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+# Tag every span recorded inside the block with one request ID
+@contextmanager
+def request_context(request_id=None):
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+# Executor threads don't inherit context variables; carry the request ID across
+def submit_with_context(executor, func, *args):
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+# Start a fresh request ID for the rest of this thread's work, e.g. one Streamlit button click
+def begin_request(request_id=None):
+    request_id = request_id or new_request_id()
+    _request_id.set(request_id)
+    return request_id
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+# Prometheus label values are quoted, so backslashes, quotes and newlines must be escaped
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in key) + '}'
+
+
+class Metrics:
+    """Per-process counters, latency histograms and startup timings.
+
+    Everything is in memory behind one lock. Spans can optionally be appended
+    to a JSON-lines trace log (``TRACE_LOG_PATH``), and the Prometheus text
+    can be written to a file every few seconds (``METRICS_TEXTFILE``) for
+    processes that don't serve HTTP.
+    """
+
+    def __init__(self, log_path=TRACE_LOG_PATH, textfile_path=METRICS_TEXTFILE):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._log = open(log_path, 'a', encoding='utf-8', buffering=1) if log_path else None
+        self._textfile_path = textfile_path
+        self._textfile_written = 0.0
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    # Startup timings are recorded once; Streamlit reruns must not overwrite them with zeros
+    def record_startup(self, phase, seconds):
+        key = ('startup_seconds', _label_key({'phase': phase}))
+        with self._lock:
+            self._gauges.setdefault(key, seconds)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    @contextmanager
+    def span(self, stage, **fields):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe(stage, seconds)
+            self.inc('stage_calls_total', stage=stage)
+            if error is not None:
+                self.inc('stage_errors_total', stage=stage)
+            if self._log is not None:
+                self._write_trace(stage, seconds, error, fields)
+            if self._textfile_path:
+                self._maybe_write_textfile()
+
+    def cache_lookup(self, cache, hit):
+        self.inc('cache_hits_total' if hit else 'cache_misses_total', cache=cache)
+
+    def _write_trace(self, stage, seconds, error, fields):
+        record = {
+            'ts': time.time(),
+            'request_id': current_request_id(),
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'error': type(error).__name__ if error is not None else None,
+        }
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._log.write(line + '\n')
+
+    def _maybe_write_textfile(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._textfile_written < TEXTFILE_INTERVAL_SECONDS:
+                return
+            self._textfile_written = now
+        tmp_path = f"{self._textfile_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, self._textfile_path)
+
+    def prometheus_text(self):
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {stage: list(values) for stage, values in self._histograms.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, key), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+        for name in sorted({name for name, _ in gauges}):
+            lines.append(f"# TYPE {name} gauge")
+            for (metric, key), value in sorted(gauges.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+        if histograms:
+            lines.append("# TYPE stage_duration_seconds histogram")
+        for stage, values in sorted(histograms.items()):
+            stage = _escape_label(stage)
+            for bound, count in zip(BUCKETS, values):
+                lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {values[-1]}')
+            lines.append(f'stage_duration_seconds_sum{{stage="{stage}"}} {values[-2]}')
+            lines.append(f'stage_duration_seconds_count{{stage="{stage}"}} {values[-1]}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': {f"{name}{_format_labels(key)}": value for (name, key), value in self._counters.items()},
+                'gauges': {f"{name}{_format_labels(key)}": value for (name, key), value in self._gauges.items()},
+                'stages': {
+                    stage: {'count': values[-1], 'sum_seconds': values[-2]}
+                    for stage, values in self._histograms.items()
+                },
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,222 @@
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from core.emotion_engine import get_emotion_engine, normalize_text
+from core.metrics import metrics
+
+# A Unix socket (or named pipe on Windows) shared by every worker on the host; "host:port" for TCP
+if sys.platform == 'win32':
+    DEFAULT_ADDRESS = r'\\.\pipe\emotion-model'
+else:
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), 'emotion-model.sock')
+MODEL_SERVER_ADDRESS = os.environ.get('MODEL_SERVER_ADDRESS', DEFAULT_ADDRESS)
+# Connections unpickle what they receive, so the key is what stands between the socket and code execution.
+# Local sockets fall back to a generated per-user key file; TCP needs MODEL_SERVER_AUTHKEY on both ends.
+MODEL_SERVER_AUTHKEY = os.environ.get('MODEL_SERVER_AUTHKEY')
+MODEL_SERVER_KEY_FILE = os.environ.get('MODEL_SERVER_KEY_FILE', os.path.join(os.path.expanduser('~'), '.emotion-model.key'))
+# After the server is found down, stay in-process this long before trying it again
+RECONNECT_SECONDS = 30
+# How long to wait for a reply before treating the server as down; a classify covers a model batch
+PING_TIMEOUT_SECONDS = 5
+CLASSIFY_TIMEOUT_SECONDS = 30
+# A server that is gone, hung, or holding a different key (another user's) all mean "classify here"
+SERVER_DOWN_ERRORS = (OSError, EOFError, AuthenticationError)
+CLIENT_WORKERS = 4
+
+
+def parse_address(address):
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and not address.startswith('\\\\'):
+        return host or 'localhost', int(port)
+    return address
+
+
+# The key file is created once, readable only by its owner; every local server and client reads the same one
+def _key_file_authkey(path=MODEL_SERVER_KEY_FILE):
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):  # Another process may have just created it and not written it yet
+            with open(path, 'rb') as f:
+                key = f.read().strip()
+            if key:
+                return key
+            time.sleep(0.01)
+        raise RuntimeError(f"Model server key file {path} is empty")
+    key = secrets.token_hex(32).encode()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def resolve_authkey(address, authkey=None):
+    authkey = authkey or MODEL_SERVER_AUTHKEY
+    if authkey:
+        return authkey.encode() if isinstance(authkey, str) else authkey
+    if isinstance(address, tuple):
+        raise ValueError("Set MODEL_SERVER_AUTHKEY to use the model server over TCP")
+    return _key_file_authkey()
+
+
+class ModelServer:
+    """Holds one emotion engine and answers classify requests from other processes.
+
+    Each connection gets a thread; they all submit into the same EmotionEngine,
+    so texts from different Streamlit workers land in the same model batch.
+    """
+
+    def __init__(self, address=MODEL_SERVER_ADDRESS, authkey=None):
+        self.address = parse_address(address)
+        self.authkey = resolve_authkey(self.address, authkey)
+        self.engine = get_emotion_engine()
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and not self.address.startswith('\\\\') and os.path.exists(self.address):
+            os.remove(self.address)  # Stale socket from a server that didn't shut down cleanly
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str) and not self.address.startswith('\\\\'):
+                os.chmod(self.address, 0o600)  # Only this user's processes may connect
+            print(f"Emotion model server listening on {listener.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception:
+                    continue  # Failed handshake; keep serving everyone else
+                threading.Thread(target=self._serve, args=(conn,), name="model-server-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    command, texts = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if command == 'ping':
+                    conn.send(('ok', None))
+                    continue
+                try:
+                    with metrics.span('model_server_request', texts=len(texts)):
+                        futures = [self.engine.submit(text) for text in texts]
+                        results = [future.result() for future in futures]
+                    conn.send(('ok', results))
+                except Exception as e:
+                    conn.send(('error', str(e)))
+
+
+class EmotionClient:
+    """Drop-in for EmotionEngine that classifies through the model server.
+
+    Connections are opened once per thread and reused. If the server can't be
+    reached, doesn't answer in time, or rejects our key, requests go to an
+    in-process engine instead and the server is retried after
+    ``RECONNECT_SECONDS``.
+    """
+
+    def __init__(self, address=MODEL_SERVER_ADDRESS, authkey=None):
+        self.address = parse_address(address)
+        self.authkey = resolve_authkey(self.address, authkey)
+        self._local = threading.local()
+        self._down_until = 0.0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=CLIENT_WORKERS, thread_name_prefix="emotion-client")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    # TimeoutError is an OSError, so a hung server counts as down; the connection is then dropped
+    # because the late reply would otherwise be read as the answer to the next request
+    def _request(self, command, texts, timeout):
+        conn = self._connection()
+        conn.send((command, texts))
+        if not conn.poll(timeout):
+            raise TimeoutError(f"Model server did not answer within {timeout}s")
+        status, payload = conn.recv()
+        if status != 'ok':
+            raise RuntimeError(payload)
+        return payload
+
+    def server_available(self):
+        if time.monotonic() < self._down_until:
+            return False
+        try:
+            self._request('ping', None, PING_TIMEOUT_SECONDS)
+            return True
+        except SERVER_DOWN_ERRORS:
+            self._drop_connection()
+            self._down_until = time.monotonic() + RECONNECT_SECONDS
+            return False
+
+    def classify_many(self, texts, timeout=None):
+        texts = list(texts)
+        if time.monotonic() >= self._down_until:
+            try:
+                with metrics.span('model_server_call', texts=len(texts)):
+                    return [tuple(result) for result in self._request('classify', texts, CLASSIFY_TIMEOUT_SECONDS)]
+            except SERVER_DOWN_ERRORS:
+                self._drop_connection()
+                self._down_until = time.monotonic() + RECONNECT_SECONDS
+        metrics.inc('model_server_fallbacks_total')
+        return get_emotion_engine().classify_many(texts, timeout)
+
+    def submit(self, text):
+        key = normalize_text(text)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._executor.submit(self._classify_one, key)
+        return future
+
+    def _classify_one(self, key):
+        try:
+            return self.classify_many([key])[0]
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def classify(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_emotion_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EmotionClient()
+        return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the emotion model to every app process on this host")
+    parser.add_argument('--address', default=MODEL_SERVER_ADDRESS,
+                        help="socket path, named pipe, or host:port (TCP needs MODEL_SERVER_AUTHKEY)")
+    args = parser.parse_args()
+    ModelServer(args.address).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import metrics, submit_with_context
+from core import speech_output
+from core import translation
+FANOUT_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+
+
+def _translate_target(text, source_lang, target_lang, synthesize_audio):
+    result = {}
+    if target_lang == source_lang:
+        result['translation'] = text
+    else:
+        with metrics.span('fanout_target', dest=target_lang):
+            result['translation'] = translation.translate_long_text(text, source_lang, target_lang)
+    if synthesize_audio:
+        # Straight after its own translation, so audio for one language never waits on another
+        # Several menu languages have no gTTS voice; that must not cost the translation
+        try:
+            result['audio'] = speech_output.synthesize_to_path(result['translation'], target_lang)
+        except Exception as e:
+            result['audio_error'] = str(e)
+    return result
+
+
+# Translate one text into every target at once. The source is detected once (unless
+# given), each target translates and optionally synthesizes on its own worker, and the
+# classifier scores every output in one batch. Returns (source_lang, {target: result})
+# where a result holds 'translation' and optionally 'audio' (or 'audio_error') and 'emotion',
+# or 'error' when the translation itself failed.
+def translate_to_many(text, target_langs, source_lang=None, classifier=None, synthesize_audio=False):
+    if not source_lang or source_lang == 'auto':
+        source_lang = translation.detect_language(text)
+    target_langs = list(dict.fromkeys(target_langs))
+    with metrics.span('fanout', targets=len(target_langs)):
+        futures = {
+            target_lang: submit_with_context(_executor, _translate_target, text, source_lang, target_lang, synthesize_audio)
+            for target_lang in target_langs
+        }
+        results = {}
+        for target_lang, future in futures.items():
+            try:
+                results[target_lang] = future.result()
+            except Exception as e:
+                results[target_lang] = {'error': str(e)}
+
+        if classifier is not None:
+            translated = [lang for lang in target_langs if 'translation' in results[lang]]
+            texts = [results[lang]['translation'] for lang in translated]
+            try:
+                for lang, emotion in zip(translated, classifier.classify_many(texts)):
+                    results[lang]['emotion'] = emotion
+            except Exception as e:
+                for lang in translated:
+                    results[lang]['emotion_error'] = str(e)
+    return source_lang, results
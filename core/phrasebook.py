@@ -0,0 +1,41 @@
+import os
+import re
+from html import unescape
+
+from core import PROJECT_DIR
+
+RICKSHAW_PHRASEBOOK = os.path.join(PROJECT_DIR, 'telrickshaw.html')
+TELUGU_HUB = os.path.join(PROJECT_DIR, 'telugu.html')
+
+_PAIR_RE = re.compile(
+    r'<span class="sentence">(.*?)</span>.*?<span class="meaning">(.*?)</span>',
+    re.DOTALL,
+)
+_TEXT_NODE_RE = re.compile(r'>([^<>]+)<')
+_TELUGU_RE = re.compile('[\u0c00-\u0c7f]')
+
+
+# Read the sentence/meaning pairs curated in telrickshaw.html
+def load_pairs(path=RICKSHAW_PHRASEBOOK):
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    pairs = []
+    seen = set()
+    for sentence, meaning in _PAIR_RE.findall(html):
+        sentence, meaning = unescape(sentence).strip(), unescape(meaning).strip()
+        if sentence and meaning and sentence not in seen:
+            seen.add(sentence)
+            pairs.append((sentence, meaning))
+    return pairs
+
+
+# Every text node in the page written in Telugu script (titles, descriptions)
+def load_telugu_phrases(path=TELUGU_HUB):
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    phrases = []
+    for text in _TEXT_NODE_RE.findall(html):
+        text = " ".join(unescape(text).split())
+        if _TELUGU_RE.search(text) and text not in phrases:
+            phrases.append(text)
+    return phrases
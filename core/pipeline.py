@@ -0,0 +1,181 @@
+import threading
+from contextlib import contextmanager
+
+from core import asr_engines
+from core import multi_target
+from core import speech_capture
+from core import speech_output
+from core import translation
+from core.audio_cache import get_audio_cache
+from core.components import registry
+from core.jobs import get_job_queue
+from core.languages import get_lang_name
+from core.metrics import metrics
+from core.playback import get_player
+from core.text_chunking import split_sentences
+from core.translation_memory import get_translation_memory
+
+
+class Pipeline:
+    """Speech in, translation, emotion and speech out, with no UI attached.
+
+    The Streamlit pages, the CLI and the HTTP server all drive the same
+    instance, so caches, worker pools and model handles exist once per
+    process and are reachable here instead of being rebuilt per page.
+    """
+
+    def __init__(self, components=registry):
+        self.components = components
+
+    # Engine and cache handles, all built lazily by the modules that own them
+    @property
+    def router(self):
+        return translation.get_router()
+
+    @property
+    def translation_cache(self):
+        return translation.get_translation_cache()
+
+    @property
+    def translation_memory(self):
+        return get_translation_memory()
+
+    @property
+    def audio_cache(self):
+        return get_audio_cache()
+
+    @property
+    def player(self):
+        return get_player()
+
+    def emotion_classifier(self):
+        return self.components.get('emotion_classifier')
+
+    def recognizer(self):
+        return self.components.get('recognizer')
+
+    def status(self):
+        return self.components.status()
+
+    # Text stages
+    def detect_language(self, text):
+        return translation.detect_language(text)
+
+    def language_name(self, lang_code):
+        return get_lang_name(lang_code)
+
+    def translate(self, text, source_lang, target_lang):
+        return translation.translate_long_text(text, source_lang, target_lang)
+
+    # (piece, error) in input order, for showing a long translation as it arrives
+    def iter_translate(self, text, source_lang, target_lang):
+        return translation.iter_translate_chunks(text, source_lang, target_lang)
+
+    def translate_to_many(self, text, target_langs, source_lang=None, with_emotion=True, synthesize_audio=False):
+        classifier = self.emotion_classifier() if with_emotion else None
+        return multi_target.translate_to_many(text, target_langs, source_lang, classifier, synthesize_audio)
+
+    def classify_emotions(self, texts):
+        with metrics.span('detect_emotion', texts=len(texts)):
+            return self.emotion_classifier().classify_many(texts)
+
+    # Speech out
+    def synthesize(self, text, language_code):
+        return speech_output.synthesize(text, language_code)
+
+    def synthesize_to_path(self, text, language_code):
+        return speech_output.synthesize_to_path(text, language_code)
+
+    def speak(self, text, language_code):
+        return speech_output.stream_speech(text, language_code)
+
+    def speak_offline(self, text):
+        engine = self.components.get('tts_engine')
+        engine.say(text)
+        engine.runAndWait()
+
+    # Background jobs: the page keeps the ID, the work and its result live in the job queue
+    def submit(self, func, *args):
+        return get_job_queue().submit(func, *args)
+
+    def job(self, job_id):
+        return get_job_queue().get(job_id)
+
+    # Job body for one target: translate, speak and score both texts. Speech and emotion
+    # failures are reported alongside the translation rather than failing the job.
+    def translate_and_speak(self, job, text, source_lang, target_lang):
+        result = {'text': text, 'translation_errors': []}
+        job.report(0.05, "Translating...")
+        if len(text) <= translation.LONG_TEXT_THRESHOLD:
+            translated = self.translate(text, source_lang, target_lang)
+        else:
+            total = max(1, len(split_sentences(text)))
+            translated = ""
+            for done, (piece, error) in enumerate(self.iter_translate(text, source_lang, target_lang), 1):
+                if error is not None:
+                    result['translation_errors'].append(str(error))
+                translated += piece
+                job.report(0.05 + 0.55 * done / total, f"Translated {done} of {total} sentences...", partial=translated)
+        result['translation'] = translated
+
+        job.report(0.6, "Synthesizing speech...")
+        try:
+            self.speak(translated, target_lang)
+        except Exception as e:
+            result['speech_error'] = str(e)
+
+        job.report(0.8, "Analyzing emotions...")
+        try:
+            result['emotions'] = self.classify_emotions([text, translated])
+        except Exception as e:
+            result['emotion_error'] = str(e)
+        return result
+
+    def translate_to_many_job(self, job, text, target_langs, source_lang, with_emotion, synthesize_audio):
+        result = {}
+        if with_emotion:
+            job.report(0.05, "Loading emotion model...")
+            try:
+                self.emotion_classifier()
+            except Exception as e:
+                result['emotion_error'] = str(e)
+                with_emotion = False
+        job.report(0.1, f"Translating into {len(target_langs)} languages...")
+        result['source_lang'], result['results'] = self.translate_to_many(
+            text, target_langs, source_lang, with_emotion, synthesize_audio
+        )
+        return result
+
+    # Speech in; recognition errors propagate as speech_recognition's own exceptions.
+    # Calibration is cached per microphone, keyed by the source's device index.
+    @contextmanager
+    def microphone(self):
+        import speech_recognition as sr
+        with sr.Microphone() as source:
+            yield source
+
+    def listen(self, source, timeout=None):
+        recognizer = self.recognizer()
+        speech_capture.calibrate(recognizer, source, getattr(source, 'device_index', None))
+        with metrics.span('listen'):
+            return recognizer.listen(source, timeout=timeout)
+
+    def recognize(self, audio, language):
+        return asr_engines.recognize(audio, language)
+
+    # (text, error) per phrase, recognized while the speaker keeps talking
+    def iter_transcripts(self, source, language, stop_event=None):
+        return speech_capture.iter_transcripts(self.recognizer(), source, language, stop_event=stop_event,
+                                               device_index=getattr(source, 'device_index', None))
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = Pipeline()
+        return _pipeline
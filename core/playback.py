@@ -0,0 +1,132 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from core.audio_buffer import ViewReader
+
+# Sound.get_length() is rounded, so after sleeping that long allow this much
+# extra for the channel to drain, in small steps
+TAIL_STEP_SECONDS = 0.02
+MAX_TAIL_SECONDS = 1.0
+
+
+class PlaybackItem:
+    def __init__(self, audio, generation):
+        self.audio = audio
+        self.generation = generation
+        self.future = Future()
+
+
+class AudioPlayer:
+    """Plays queued audio on one mixer channel from a dedicated worker thread.
+
+    ``play`` accepts MP3 bytes (or a view of them), a file path, or a Future
+    resolving to either (so synthesis can still be running) and returns a
+    Future that completes when that clip has finished playing. Waiting is
+    done on events sized to the clip length, never by spinning on ``get_busy``.
+    """
+
+    def __init__(self, channel_id=0):
+        self.channel_id = channel_id
+        self._queue = queue.Queue()
+        self._interrupt = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        # Bumped by clear() so an item the worker already dequeued is dropped too
+        self._generation = 0
+        self._worker = threading.Thread(target=self._run, name="audio-player", daemon=True)
+        self._worker.start()
+
+    def play(self, audio):
+        with self._idle:
+            self._pending += 1
+            item = PlaybackItem(audio, self._generation)
+        self._queue.put(item)
+        return item.future
+
+    # Stop the clip that is playing now and move on to the next one
+    def skip(self):
+        self._interrupt.set()
+
+    # Drop everything queued and stop the current clip
+    def clear(self):
+        with self._idle:
+            self._generation += 1
+            self._interrupt.set()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            item.future.cancel()
+            self._finish()
+
+    def wait(self, timeout=None):
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def is_busy(self):
+        with self._idle:
+            return self._pending > 0
+
+    def _finish(self):
+        with self._idle:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _run(self):
+        import pygame
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        channel = pygame.mixer.Channel(self.channel_id)
+        while True:
+            item = self._queue.get()
+            try:
+                with self._idle:
+                    if item.generation != self._generation:
+                        item.future.cancel()
+                    else:
+                        self._interrupt.clear()
+                if not item.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    sound = self._load(pygame, item.audio)
+                    channel.play(sound)
+                    self._wait_for_end(channel, sound.get_length())
+                except Exception as e:
+                    item.future.set_exception(e)
+                    continue
+                item.future.set_result(not self._interrupt.is_set())
+            finally:
+                self._finish()
+
+    def _load(self, pygame, audio):
+        if isinstance(audio, Future):
+            audio = audio.result()
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            return pygame.mixer.Sound(file=ViewReader(audio))
+        return pygame.mixer.Sound(file=audio)
+
+    def _wait_for_end(self, channel, length):
+        if self._interrupt.wait(length):
+            channel.stop()
+            return
+        tail = 0.0
+        while channel.get_busy() and tail < MAX_TAIL_SECONDS:
+            if self._interrupt.wait(TAIL_STEP_SECONDS):
+                channel.stop()
+                return
+            tail += TAIL_STEP_SECONDS
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_player():
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = AudioPlayer()
+        return _player
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import Future
+
+from core.metrics import metrics
+
+
+class SingleFlight:
+    """Coalesces identical calls that are in flight at the same time.
+
+    The first caller for a key runs the function; anyone asking for the same
+    key before it returns waits on the same future and gets the same result
+    (or exception). Nothing is remembered afterwards; that's the caches' job.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, func, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            metrics.inc('singleflight_shared_total', group=self.name)
+            return future.result()
+
+        metrics.inc('singleflight_calls_total', group=self.name)
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -0,0 +1,194 @@
+import array
+import contextvars
+import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.audio_buffer import AudioBuffer, RingBuffer
+from core.metrics import metrics, submit_with_context
+
+FRAME_SECONDS = 0.03
+# A pause this long closes a segment; a longer one ends the dictation
+SEGMENT_PAUSE_SECONDS = 0.5
+END_PAUSE_SECONDS = 2.0
+MAX_SEGMENT_SECONDS = 10
+MIN_SPEECH_SECONDS = 0.25
+# Audio kept from just before speech starts, so first syllables aren't clipped
+PRE_ROLL_SECONDS = 0.2
+START_TIMEOUT_SECONDS = 5
+MAX_DICTATION_SECONDS = 120
+CALIBRATION_SECONDS = 1
+CALIBRATION_TTL_SECONDS = 600
+RECOGNIZE_WORKERS = 3
+
+_calibrations = {}
+_calibration_lock = threading.Lock()
+_recognize_executor = ThreadPoolExecutor(max_workers=RECOGNIZE_WORKERS, thread_name_prefix="recognize-segment")
+
+_SAMPLE_TYPECODES = {1: 'b', 2: 'h', 4: 'i'}
+
+
+# Ambient noise calibration takes a second of silence; do it once per device, not once per click
+def calibrate(recognizer, source, device_index=None):
+    now = time.monotonic()
+    with _calibration_lock:
+        cached = _calibrations.get(device_index)
+    if cached is not None and now - cached[1] < CALIBRATION_TTL_SECONDS:
+        recognizer.energy_threshold = cached[0]
+        return cached[0]
+    with metrics.span('calibrate_microphone'):
+        recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_SECONDS)
+    with _calibration_lock:
+        _calibrations[device_index] = (recognizer.energy_threshold, now)
+    return recognizer.energy_threshold
+
+
+# RMS of one frame of PCM, in the same units as Recognizer.energy_threshold
+def frame_energy(frame, sample_width):
+    samples = array.array(_SAMPLE_TYPECODES[sample_width], frame[:len(frame) - len(frame) % sample_width])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+class SegmentDetector:
+    """Frame-level voice activity detection that cuts speech at pauses.
+
+    Frames go in one at a time; ``feed`` returns a view of a finished segment's
+    PCM when a pause closes one (or it reaches ``MAX_SEGMENT_SECONDS``). Frames
+    before speech wait in a ring buffer and each segment is built in one
+    AudioBuffer, so no frame is copied twice on the way to the recognizer. Uses
+    webrtcvad when it is installed and the sample rate allows, otherwise the
+    recognizer's energy threshold.
+    """
+
+    def __init__(self, sample_rate, sample_width, energy_threshold, frame_seconds=FRAME_SECONDS):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.energy_threshold = energy_threshold
+        self.frame_seconds = frame_seconds
+        self._vad = None
+        if sample_width == 2 and sample_rate in (8000, 16000, 32000, 48000):
+            try:
+                import webrtcvad
+                self._vad = webrtcvad.Vad(2)
+            except ImportError:
+                pass
+        self._pre_roll = RingBuffer(int(PRE_ROLL_SECONDS * sample_rate) * sample_width)
+        self._segment = None
+        self._speech_seconds = 0.0
+        self._silence_seconds = 0.0
+        self.heard_speech = False
+        self.trailing_silence = 0.0
+
+    def is_speech(self, frame):
+        if self._vad is not None:
+            return self._vad.is_speech(frame, self.sample_rate)
+        return frame_energy(frame, self.sample_width) > self.energy_threshold
+
+    def feed(self, frame):
+        speech = self.is_speech(frame)
+        self.trailing_silence = 0.0 if speech else self.trailing_silence + self.frame_seconds
+        if self._segment is None:
+            if not speech:
+                self._pre_roll.write(frame)
+                return None
+            self._segment = AudioBuffer(int(MAX_SEGMENT_SECONDS * self.sample_rate) * self.sample_width)
+            self._pre_roll.drain_into(self._segment)
+            self._speech_seconds = self._silence_seconds = 0.0
+
+        self._segment.append(frame)
+        if speech:
+            self._speech_seconds += self.frame_seconds
+            self._silence_seconds = 0.0
+            self.heard_speech = True
+        else:
+            self._silence_seconds += self.frame_seconds
+        segment_seconds = len(self._segment) / (self.sample_rate * self.sample_width)
+        if self._silence_seconds >= SEGMENT_PAUSE_SECONDS or segment_seconds >= MAX_SEGMENT_SECONDS:
+            return self.flush()
+        return None
+
+    def flush(self):
+        segment, speech_seconds = self._segment, self._speech_seconds
+        self._segment = None
+        self._speech_seconds = self._silence_seconds = 0.0
+        if segment is None or speech_seconds < MIN_SPEECH_SECONDS:
+            return None  # A cough or a click, not worth a recognition call
+        return segment.view()
+
+
+# Read the microphone frame by frame and yield an AudioData per spoken segment
+def capture_segments(recognizer, source, stop_event=None, device_index=None):
+    import speech_recognition as sr
+
+    threshold = calibrate(recognizer, source, device_index)
+    detector = SegmentDetector(source.SAMPLE_RATE, source.SAMPLE_WIDTH, threshold)
+    frame_samples = int(source.SAMPLE_RATE * FRAME_SECONDS)
+    started = time.monotonic()
+    while stop_event is None or not stop_event.is_set():
+        elapsed = time.monotonic() - started
+        if elapsed > MAX_DICTATION_SECONDS:
+            break
+        if not detector.heard_speech and elapsed > START_TIMEOUT_SECONDS:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        if detector.heard_speech and detector.trailing_silence >= END_PAUSE_SECONDS:
+            break
+        segment = detector.feed(source.stream.read(frame_samples))
+        if segment is not None:
+            yield sr.AudioData(segment, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    segment = detector.flush()
+    if segment is not None:
+        yield sr.AudioData(segment, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+
+def _recognize_segment(recognize, audio):
+    import speech_recognition as sr
+
+    with metrics.span('recognize_segment', seconds=round(len(audio.frame_data) / (audio.sample_rate * audio.sample_width), 2)):
+        try:
+            return recognize(audio)
+        except sr.UnknownValueError:
+            return ""
+
+
+# Recognize each segment as soon as the speaker pauses, while capture carries on.
+# Yields (text, error) per segment in spoken order, like iter_translate_chunks.
+def iter_transcripts(recognizer, source, language='en', recognize=None, stop_event=None, device_index=None):
+    if recognize is None:
+        from core import asr_engines
+        recognize = lambda audio: asr_engines.recognize(audio, language)
+    stop_event = stop_event or threading.Event()
+    results = queue.Queue()
+
+    def capture():
+        try:
+            for audio in capture_segments(recognizer, source, stop_event, device_index):
+                results.put(submit_with_context(_recognize_executor, _recognize_segment, recognize, audio))
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(None)
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(capture,), name="speech-capture", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            try:
+                text = item.result()
+            except Exception as e:
+                yield "", e
+                continue
+            if text:
+                yield text, None
+    finally:
+        # The caller closes the microphone after this; capture must be done with it first
+        stop_event.set()
+        thread.join()
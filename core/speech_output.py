@@ -0,0 +1,112 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from core.audio_buffer import AudioBuffer
+from core.audio_cache import DEFAULT_VOICE, audio_key, get_audio_cache
+from core.metrics import metrics, submit_with_context
+from core.playback import get_player
+from core.singleflight import SingleFlight
+from core.upstream import UnsupportedLanguageError, get_upstream
+from core.text_chunking import split_sentences
+
+TTS_WORKERS = 4
+# gTTS sends at most 100 characters per upstream request, so segments of that
+# size cost one round trip each and the first one is ready quickly
+SEGMENT_CHARS = 100
+
+_executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+_flight = SingleFlight('tts')
+
+
+@functools.lru_cache(maxsize=1)
+def _gtts_languages():
+    from gtts.lang import tts_langs
+    return frozenset(tts_langs())
+
+
+def _gtts_mp3(text, language_code, voice):
+    from gtts import gTTS
+    # Checked before the upstream call: an unsupported code is not an outage to retry
+    if language_code not in _gtts_languages():
+        raise UnsupportedLanguageError(f"Text-to-speech is not available for language '{language_code}'")
+    def request():
+        # gTTS writes straight into the buffer; callers get a view of it, not a copy
+        mp3 = AudioBuffer()
+        gTTS(text=text, lang=language_code, tld=voice).write_to_fp(mp3)
+        return mp3.view()
+    with metrics.span('tts_synthesis', lang=language_code, chars=len(text)):
+        return get_upstream('gtts').call(request)
+
+
+# One gTTS request per phrase however many sessions ask for it at once; returns (mp3, path)
+def _synthesize_into_cache(text, language_code, voice):
+    def run():
+        audio = _gtts_mp3(text, language_code, voice)
+        return audio, get_audio_cache().put(text, language_code, audio, voice)
+    return _flight.do(audio_key(text, language_code, voice), run)
+
+
+# The text's MP3 as a read-only buffer: the cached file memory-mapped when this phrase was spoken before
+def synthesize(text, language_code, voice=DEFAULT_VOICE):
+    audio = get_audio_cache().get(text, language_code, voice)
+    metrics.cache_lookup('audio', audio is not None)
+    if audio is None:
+        audio, _ = _synthesize_into_cache(text, language_code, voice)
+    return audio
+
+
+# Path of the cached MP3 for the text, synthesizing it on a miss
+def synthesize_to_path(text, language_code, voice=DEFAULT_VOICE):
+    path = get_audio_cache().get_path(text, language_code, voice)
+    metrics.cache_lookup('audio', path is not None)
+    if path is None:
+        _, path = _synthesize_into_cache(text, language_code, voice)
+    return path
+
+
+def split_segments(text):
+    return [sentence.strip() for sentence, _ in split_sentences(text, max_chars=SEGMENT_CHARS) if sentence.strip()]
+
+
+class SpeechStream:
+    """The segments of one utterance, queued in order on the shared AudioPlayer."""
+
+    def __init__(self, synthesis_futures, playback_futures):
+        self.synthesis_futures = synthesis_futures
+        self.playback_futures = playback_futures
+
+    @property
+    def errors(self):
+        return [f.exception() for f in self.playback_futures if f.done() and not f.cancelled() and f.exception()]
+
+    def cancel(self):
+        for future in self.synthesis_futures:
+            future.cancel()
+        playing = any(future.running() for future in self.playback_futures)
+        for future in self.playback_futures:
+            future.cancel()
+        if playing:
+            get_player().skip()
+
+    def join(self, timeout=None):
+        wait(self.playback_futures, timeout)
+
+
+# Synthesize every segment concurrently and start speaking as soon as the first is
+# ready; the player waits on each later segment's future in turn. Like
+# pygame.mixer.music.load, a new stream replaces whatever is playing.
+def stream_speech(text, language_code):
+    segments = split_segments(text)
+    if not segments:
+        return None
+    synthesis_futures = [submit_with_context(_executor, synthesize, segment, language_code) for segment in segments]
+    try:
+        # Synthesis errors on the first segment surface to the caller right away
+        synthesis_futures[0].result()
+    except Exception:
+        for future in synthesis_futures[1:]:
+            future.cancel()
+        raise
+    player = get_player()
+    player.clear()
+    return SpeechStream(synthesis_futures, [player.play(future) for future in synthesis_futures])
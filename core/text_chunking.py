@@ -0,0 +1,50 @@
+import re
+
+# googletrans rejects requests over 5000 characters; stay well under it
+MAX_CHUNK_CHARS = 1000
+
+# Full stop, question and exclamation marks plus the Devanagari danda and double
+# danda (shared by most Indic scripts, Telugu included) and the Urdu full stop
+# and question mark
+SENTENCE_TERMINATORS = '.!?।॥۔؟'
+CLOSING_MARKS = '"\'”’)]'
+
+_BOUNDARY_RE = re.compile(
+    r'[%s]+[%s]*(?P<space>[ \t\r\f\v]+)|(?P<para>\s*\n\s*)'
+    % (re.escape(SENTENCE_TERMINATORS), re.escape(CLOSING_MARKS))
+)
+
+
+# Split text into (sentence, separator) pairs such that joining them restores the text
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    pieces = []
+    start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        group = 'space' if match.group('space') is not None else 'para'
+        end = match.start(group)
+        if end > start:
+            pieces.extend(_split_long(text[start:end], match.group(group), max_chars))
+        elif pieces:
+            sentence, separator = pieces[-1]
+            pieces[-1] = (sentence, separator + match.group(group))
+        else:
+            pieces.append(('', match.group(group)))
+        start = match.end()
+    if start < len(text):
+        pieces.extend(_split_long(text[start:], '', max_chars))
+    return pieces
+
+
+# A sentence longer than max_chars is broken at the last space that fits
+def _split_long(sentence, separator, max_chars):
+    parts = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        rest = sentence[cut:].lstrip(' ')
+        # The run of spaces at the cut becomes the separator, however long it is
+        parts.append((sentence[:cut], sentence[cut:len(sentence) - len(rest)]))
+        sentence = rest
+    parts.append((sentence, separator))
+    return parts
@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langdetect import detect
+
+from core.cpu_pool import get_cpu_pool
+from core.metrics import metrics, submit_with_context
+from core.text_chunking import split_sentences
+from core.singleflight import SingleFlight
+from core.translation_cache import TranslationCache, normalize_text
+from core.translation_engines import EngineRouter, LocalEngine, RemoteEngine, parse_routes
+from core.translation_memory import get_translation_memory
+
+# Inputs longer than this are translated sentence by sentence
+LONG_TEXT_THRESHOLD = 500
+TRANSLATE_WORKERS = 4
+# e.g. "en:hi=cache,local;*=cache,remote,local" to keep a pair off the network
+TRANSLATION_ROUTES = os.environ.get('TRANSLATION_ROUTES', '')
+
+_translator = None
+_translator_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+_router = None
+_router_lock = threading.Lock()
+# Sessions translating the same phrase at the same moment share one upstream call
+_flight = SingleFlight('translate')
+_chunk_executor = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate-chunk")
+
+
+# googletrans keeps a pooled HTTP client on the Translator, so every caller shares one
+def get_translator():
+    global _translator
+    with _translator_lock:
+        if _translator is None:
+            from googletrans import Translator
+            _translator = Translator()
+        return _translator
+
+
+def get_translation_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
+
+
+def get_router():
+    global _router
+    with _router_lock:
+        if _router is None:
+            engines = {'remote': RemoteEngine(get_translator), 'local': LocalEngine()}
+            _router = EngineRouter(engines, get_translation_cache(), parse_routes(TRANSLATION_ROUTES))
+        return _router
+
+
+def detect_language(text):
+    pool = get_cpu_pool('detect')
+    with metrics.span('detect_language'):
+        if pool is not None:
+            try:
+                return pool.detect_language(text) or "en"  # None: nothing to detect from
+            except Exception:
+                # A pool failure is not an answer; detect here rather than report English
+                metrics.inc('cpu_pool_fallbacks_total', stage='detect')
+        try:
+            return detect(text)
+        except Exception:
+            return "en"  # Default to English if detection fails
+
+
+# Approved phrasebook translations win over anything an engine would say
+def lookup_memory(text, source_lang, target_lang):
+    approved = get_translation_memory().lookup(text, source_lang, target_lang)
+    metrics.cache_lookup('translation_memory', approved is not None)
+    return approved
+
+
+def translate_text(text, source_lang, target_lang):
+    approved = lookup_memory(text, source_lang, target_lang)
+    if approved is not None:
+        return approved
+    key = (normalize_text(text), source_lang, target_lang)
+    return _flight.do(key, get_router().translate, text, source_lang, target_lang)
+
+
+# Several texts in one engine call (one batched generate for NLLB); duplicates are sent once
+def translate_batch(texts, source_lang, target_lang):
+    results = [lookup_memory(text, source_lang, target_lang) for text in texts]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        translated = dict(zip(unique, get_router().translate_batch(unique, source_lang, target_lang)))
+        for i in missing:
+            results[i] = translated[texts[i]]
+    return results
+
+
+# Translate sentence by sentence on a bounded pool, yielding (piece, error) in input
+# order as soon as each piece is ready. A failed sentence comes back untranslated
+# with its error instead of failing the whole document.
+def iter_translate_chunks(text, source_lang, target_lang):
+    pieces = split_sentences(text)
+    futures = [
+        submit_with_context(_chunk_executor, translate_text, sentence.strip(), source_lang, target_lang)
+        if sentence.strip() else None
+        for sentence, _ in pieces
+    ]
+    for (sentence, separator), future in zip(pieces, futures):
+        if future is None:
+            yield sentence + separator, None
+            continue
+        try:
+            yield future.result() + separator, None
+        except Exception as e:
+            yield sentence + separator, e
+
+
+def translate_long_text(text, source_lang, target_lang):
+    if len(text) <= LONG_TEXT_THRESHOLD:
+        return translate_text(text, source_lang, target_lang)
+    pieces, errors = [], []
+    for piece, error in iter_translate_chunks(text, source_lang, target_lang):
+        pieces.append(piece)
+        if error is not None:
+            errors.append(error)
+    # Partial results are worth returning; a document where nothing translated is not
+    if errors and len(errors) == sum(1 for sentence, _ in split_sentences(text) if sentence.strip()):
+        raise errors[0]
+    return "".join(pieces)
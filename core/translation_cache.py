@@ -0,0 +1,147 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from core import PROJECT_DIR
+
+DEFAULT_CACHE_PATH = os.environ.get('TRANSLATION_CACHE_PATH', os.path.join(PROJECT_DIR, 'translation_cache.sqlite3'))
+DEFAULT_TTL_SECONDS = int(os.environ.get('TRANSLATION_CACHE_TTL', 30 * 24 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('TRANSLATION_CACHE_MAX_ENTRIES', 50000))
+# Counting rows is a table scan, so size-based eviction only runs every N writes
+EVICT_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    text TEXT NOT NULL,
+    src TEXT NOT NULL,
+    dest TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (text, src, dest)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used);
+"""
+
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+class TranslationCache:
+    """SQLite-backed translation cache shared by every process on the host.
+
+    Entries are keyed by (normalized text, src, dest), expire after
+    ``ttl_seconds`` and are evicted least-recently-used beyond ``max_entries``.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    # sqlite3 connections can't be shared across threads, so keep one per thread
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, text, src, dest):
+        key = (normalize_text(text), src, dest)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT translation, created FROM translations WHERE text = ? AND src = ? AND dest = ?", key
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            with self._lock:
+                self.misses += 1
+            return None
+        conn.execute("UPDATE translations SET last_used = ? WHERE text = ? AND src = ? AND dest = ?", (now,) + key)
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def put(self, text, src, dest, translation):
+        self.put_many([(text, src, dest, translation)])
+
+    def put_many(self, entries):
+        now = time.time()
+        rows = [(normalize_text(text), src, dest, translation, now, now) for text, src, dest, translation in entries]
+        if not rows:
+            return
+        conn = self._connect()
+        conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)", rows)
+        with self._lock:
+            self._writes += len(rows)
+            due = self._writes >= EVICT_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM translations WHERE (text, src, dest) IN "
+                "(SELECT text, src, dest FROM translations ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    # Preload known-good translations, e.g. the curated phrasebook pairs
+    def warm_up(self, entries):
+        self.put_many(list(entries))
+
+    def stats(self):
+        entries = self._connect().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'entries': entries,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._connect().execute("DELETE FROM translations")
+
+
+def main():
+    from core.phrasebook import RICKSHAW_PHRASEBOOK, load_pairs
+
+    parser = argparse.ArgumentParser(description="Inspect or warm the persistent translation cache")
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--warm', nargs='?', const=RICKSHAW_PHRASEBOOK, metavar='PHRASEBOOK_HTML',
+                        help="load sentence/meaning pairs as te->en translations")
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+
+    cache = TranslationCache(args.path)
+    if args.clear:
+        cache.clear()
+    if args.warm:
+        pairs = load_pairs(args.warm)
+        cache.warm_up((sentence, 'te', 'en', meaning) for sentence, meaning in pairs)
+        print(f"Loaded {len(pairs)} phrasebook pairs from {args.warm}")
+    print(cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import os
+import threading
+import time
+
+from core.metrics import metrics
+from core.upstream import get_upstream
+
+# FLORES-200 codes NLLB uses for the languages in the apps' lang_code maps
+NLLB_LANGUAGE_CODES = {
+    'en': 'eng_Latn', 'hi': 'hin_Deva', 'ta': 'tam_Taml', 'te': 'tel_Telu', 'bn': 'ben_Beng',
+    'mr': 'mar_Deva', 'gu': 'guj_Gujr', 'pa': 'pan_Guru', 'ml': 'mal_Mlym', 'kn': 'kan_Knda',
+    'or': 'ory_Orya', 'ur': 'urd_Arab', 'as': 'asm_Beng', 'mai': 'mai_Deva', 'sa': 'san_Deva',
+    'sd': 'snd_Arab', 'ne': 'npi_Deva', 'bho': 'bho_Deva', 'ks': 'kas_Arab', 'mni': 'mni_Beng',
+    'es': 'spa_Latn', 'fr': 'fra_Latn', 'de': 'deu_Latn', 'it': 'ita_Latn', 'pt': 'por_Latn',
+    'ru': 'rus_Cyrl', 'ja': 'jpn_Jpan', 'ko': 'kor_Hang',
+}
+LOCAL_MODEL = os.environ.get('LOCAL_TRANSLATION_MODEL', 'facebook/nllb-200-distilled-600M')
+LOCAL_MAX_BATCH = 16
+# Per language pair, which sources to try in order: "src:dest=cache,local;*=cache,remote,local"
+DEFAULT_ROUTES = '*=cache,remote,local'
+
+
+class TranslationEngine:
+    name = 'engine'
+
+    def supports(self, source_lang, target_lang):
+        return True
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        raise NotImplementedError
+
+
+class RemoteEngine(TranslationEngine):
+    """googletrans over the network, through the process-wide Translator.
+
+    Calls are rate-limited and retried by the shared upstream layer; while its
+    circuit is open this engine fails fast and the router moves on.
+    """
+
+    name = 'remote'
+
+    def __init__(self, get_translator):
+        self.get_translator = get_translator
+
+    # Codes googletrans doesn't know are rejected here, not by a retried upstream call,
+    # so the router moves on (e.g. to NLLB for Maithili or Bhojpuri)
+    def supports(self, source_lang, target_lang):
+        try:
+            from googletrans import LANGUAGES
+        except ImportError:
+            return True  # Stand-in translators (benchmark.py) decide for themselves
+        return (source_lang == 'auto' or source_lang.lower() in LANGUAGES) and target_lang.lower() in LANGUAGES
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        translations = get_upstream('translate').call(
+            self.get_translator().translate, list(texts), src=source_lang, dest=target_lang
+        )
+        return [translation.text for translation in translations]
+
+
+class LocalEngine(TranslationEngine):
+    """NLLB-200 distilled on CPU through transformers, loaded once per process."""
+
+    name = 'local'
+    _model = None
+    _tokenizer = None
+    _load_lock = threading.Lock()
+    # The tokenizer's src_lang is shared state, so generation is serialized
+    _generate_lock = threading.Lock()
+
+    def __init__(self, model_name=LOCAL_MODEL, max_batch=LOCAL_MAX_BATCH):
+        self.model_name = model_name
+        self.max_batch = max_batch
+
+    def supports(self, source_lang, target_lang):
+        return source_lang in NLLB_LANGUAGE_CODES and target_lang in NLLB_LANGUAGE_CODES
+
+    def load(self):
+        cls = type(self)
+        with cls._load_lock:
+            if cls._model is None:
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                with metrics.span('local_translation_model_load'):
+                    cls._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                    cls._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name).eval()
+        return cls._model, cls._tokenizer
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        import torch
+
+        model, tokenizer = self.load()
+        results = []
+        with self._generate_lock, torch.inference_mode():
+            tokenizer.src_lang = NLLB_LANGUAGE_CODES[source_lang]
+            target_token = tokenizer.convert_tokens_to_ids(NLLB_LANGUAGE_CODES[target_lang])
+            for start in range(0, len(texts), self.max_batch):
+                batch = list(texts[start:start + self.max_batch])
+                inputs = tokenizer(batch, return_tensors='pt', padding=True, truncation=True, max_length=512)
+                generated = model.generate(
+                    **inputs,
+                    forced_bos_token_id=target_token,
+                    max_new_tokens=int(inputs['input_ids'].shape[1] * 2) + 16,
+                )
+                results.extend(tokenizer.batch_decode(generated, skip_special_tokens=True))
+        return results
+
+
+def parse_routes(spec):
+    routes = {}
+    for rule in filter(None, (part.strip() for part in spec.split(';'))):
+        pair, _, order = rule.partition('=')
+        routes[pair.strip()] = [name.strip() for name in order.split(',') if name.strip()]
+    return routes
+
+
+class EngineRouter:
+    """Answers from the translation cache, then the engines configured for the pair.
+
+    Routes map ``"src:dest"`` (or ``"*"``) to an ordered list drawn from
+    ``cache``, ``local`` and ``remote``. Engines that don't support the pair
+    are skipped; if one fails the next is tried.
+    """
+
+    def __init__(self, engines, cache, routes=None):
+        self.engines = engines
+        self.cache = cache
+        self.routes = parse_routes(DEFAULT_ROUTES)
+        self.routes.update(routes or {})
+
+    def route(self, source_lang, target_lang):
+        return self.routes.get(f"{source_lang}:{target_lang}") or self.routes['*']
+
+    def translate(self, text, source_lang, target_lang):
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        order = self.route(source_lang, target_lang)
+        results = [None] * len(texts)
+        if 'cache' in order:
+            for i, text in enumerate(texts):
+                results[i] = self.cache.get(text, source_lang, target_lang)
+                metrics.cache_lookup('translation', results[i] is not None)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        error = None
+        for name in order:
+            engine = self.engines.get(name)
+            if engine is None or not engine.supports(source_lang, target_lang):
+                continue
+            batch = [texts[i] for i in missing]
+            try:
+                with metrics.span('translate', engine=name, src=source_lang, dest=target_lang, texts=len(batch)):
+                    translated = engine.translate_batch(batch, source_lang, target_lang)
+            except Exception as e:
+                error = error or e  # Report the preferred engine's failure, not the last fallback's
+                continue
+            for i, translation in zip(missing, translated):
+                results[i] = translation
+            if 'cache' in order:
+                self.cache.put_many(
+                    (texts[i], source_lang, target_lang, results[i]) for i in missing
+                )
+            return results
+        raise error or LookupError(f"No translation engine available for {source_lang}->{target_lang}")
+
+
+# Run each engine over the same inputs and report latency side by side
+def benchmark(engines, texts, source_lang, target_lang, repeat=1):
+    report = {}
+    for engine in engines:
+        if not engine.supports(source_lang, target_lang):
+            report[engine.name] = {'error': f"unsupported pair {source_lang}->{target_lang}"}
+            continue
+        timings = []
+        try:
+            if isinstance(engine, LocalEngine):
+                engine.load()  # Model load is a startup cost, not per-request latency
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs = engine.translate_batch(texts, source_lang, target_lang)
+                timings.append(time.perf_counter() - started)
+        except Exception as e:
+            report[engine.name] = {'error': str(e)}
+            continue
+        best = min(timings)
+        report[engine.name] = {
+            'best_seconds': best,
+            'texts_per_second': len(texts) / best if best else float('inf'),
+            'outputs': outputs,
+        }
+    return report
+
+
+def main():
+    from core.phrasebook import load_pairs
+    from core.translation import get_translator
+
+    parser = argparse.ArgumentParser(description="Benchmark translation engines on the same inputs")
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--dest', default='te')
+    parser.add_argument('--engines', default='remote,local')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('input', nargs='?', help="one sentence per line; defaults to the rickshaw phrasebook meanings")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = [meaning for _, meaning in load_pairs()]
+
+    available = {'remote': RemoteEngine(get_translator), 'local': LocalEngine()}
+    engines = [available[name] for name in args.engines.split(',')]
+    report = benchmark(engines, texts, args.src, args.dest, args.repeat)
+
+    for name, result in report.items():
+        if 'error' in result:
+            print(f"{name:>8}: {result['error']}")
+        else:
+            print(f"{name:>8}: {result['best_seconds']:.3f}s for {len(texts)} texts "
+                  f"({result['texts_per_second']:.1f} texts/s)")
+    ok = [name for name, result in report.items() if 'outputs' in result]
+    for i, text in enumerate(texts[:10]):
+        print(f"\n{text}")
+        for name in ok:
+            print(f"  {name:>8}: {report[name]['outputs'][i]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import json
+import os
+import re
+import threading
+import zlib
+
+from core import PROJECT_DIR
+from core.phrasebook import load_pairs
+
+TRANSLATION_MEMORY_PATH = os.environ.get('TRANSLATION_MEMORY_PATH', os.path.join(PROJECT_DIR, 'translation_memory.jsonl'))
+# telrickshaw.html pairs romanized Telugu sentences with their English meaning
+PHRASEBOOK_LANGS = ('te', 'en')
+# A near match must agree word for word: at most one word may differ, by one edit, and
+# only if it is long enough that one edit is a typo rather than another word ("Pune"
+# vs "Pine"). Numbers and negations must match exactly on top of this.
+MAX_TYPO_WORDS = 1
+TYPO_MIN_LENGTH = 5
+NUM_HASHES = 32
+BANDS = 16
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+# Fixed hash parameters so signatures are comparable across processes
+_HASH_PARAMS = [
+    (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(NUM_HASHES)
+]
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_NUMBER_RE = re.compile(r'\d+')
+# English, plus the romanized Telugu and Hindi the phrasebook pages use; "don't" normalizes to "don t"
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'nor', 'neither', 'cannot', 't',
+    'dont', 'doesnt', 'didnt', 'isnt', 'arent', 'wasnt', 'werent', 'wont', 'cant', 'couldnt',
+    'shouldnt', 'wouldnt', 'hasnt', 'havent', 'hadnt', 'aint',
+    'ledu', 'ledhu', 'kadu', 'kaadu', 'vaddu', 'radu', 'raadu', 'ledhe', 'nahi', 'nahin', 'mat',
+})
+
+
+# Case, punctuation and spacing never change which stored phrase a text means
+def normalize_phrase(text):
+    return " ".join(_PUNCTUATION_RE.sub(' ', text.lower()).split())
+
+
+def shingles(normalized):
+    padded = f" {normalized} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {padded}
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def _one_edit_apart(a, b):
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        # One substitution, or two adjacent letters swapped
+        return len(diffs) == 1 or (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                                   and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    i = next((i for i in range(len(shorter)) if shorter[i] != longer[i]), len(shorter))
+    return shorter[i:] == longer[i + 1:]
+
+
+# Number of typo'd words between two phrases, or None if they say different things
+def word_edits(words, entry_words):
+    if len(words) != len(entry_words):
+        return None
+    edits = 0
+    for word, entry_word in zip(words, entry_words):
+        if word == entry_word:
+            continue
+        if min(len(word), len(entry_word)) < TYPO_MIN_LENGTH or not _one_edit_apart(word, entry_word):
+            return None
+        edits += 1
+    return edits if edits <= MAX_TYPO_WORDS else None
+
+
+def minhash(shingle_set):
+    hashed = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set]
+    return tuple(min((a * h + b) % _PRIME for h in hashed) for a, b in _HASH_PARAMS)
+
+
+class TranslationMemory:
+    """Human-approved translations with exact and near-duplicate lookup.
+
+    Exact lookups hit a dict keyed by normalized text and language pair. Near
+    matches use MinHash signatures over character trigrams, banded into an
+    LSH index so only a handful of candidates are compared; a candidate is
+    used only if it agrees word for word apart from a typo (``word_edits``)
+    and has the same numbers and negations.
+
+    Pairs are indexed in the direction they were approved only: the reverse
+    of a romanized phrasebook sentence is not text a translator should return.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._exact = {}
+        self._entries = []
+        self._buckets = {}
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _index(self, text, source_lang, translation, target_lang):
+        key = normalize_phrase(text)
+        if not key:
+            return
+        shingle_set = shingles(key)
+        signature = minhash(shingle_set)
+        rows = NUM_HASHES // BANDS
+        words = tuple(key.split())
+        with self._lock:
+            self._exact[(key, source_lang, target_lang)] = translation
+            self._sources.setdefault(target_lang, set()).add(source_lang)
+            entry_id = len(self._entries)
+            self._entries.append((words, tuple(_NUMBER_RE.findall(key)), NEGATIONS.intersection(words), translation))
+            for band in range(BANDS):
+                bucket = (source_lang, target_lang, band, signature[band * rows:(band + 1) * rows])
+                self._buckets.setdefault(bucket, []).append(entry_id)
+
+    def add(self, text, source_lang, translation, target_lang, persist=True):
+        self._index(text, source_lang, translation, target_lang)
+        if persist and self.path:
+            record = {'text': text, 'src': source_lang, 'translation': translation, 'dest': target_lang}
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.add(record['text'], record['src'], record['translation'], record['dest'], persist=False)
+
+    # source_lang 'auto' (or None) checks every source language approved into target_lang
+    def lookup(self, text, source_lang, target_lang):
+        key = normalize_phrase(text)
+        if not key:
+            return None
+        if source_lang in (None, 'auto'):
+            sources = sorted(self._sources.get(target_lang, ()))
+        else:
+            sources = [source_lang]
+        for source in sources:
+            exact = self._exact.get((key, source, target_lang))
+            if exact is not None:
+                return exact
+        for source in sources:
+            nearest = self.nearest(key, source, target_lang)
+            if nearest is not None:
+                return nearest
+        return None
+
+    def nearest(self, key, source_lang, target_lang):
+        shingle_set = shingles(key)
+        signature = minhash(shingle_set)
+        rows = NUM_HASHES // BANDS
+        words = tuple(key.split())
+        numbers = tuple(_NUMBER_RE.findall(key))
+        negations = NEGATIONS.intersection(words)
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self._buckets.get((source_lang, target_lang, band, signature[band * rows:(band + 1) * rows]), ()))
+        best, best_edits = None, MAX_TYPO_WORDS + 1
+        for entry_id in candidates:
+            entry_words, entry_numbers, entry_negations, translation = self._entries[entry_id]
+            if entry_numbers != numbers:
+                continue  # "10 rupees" is not a typo of "100 rupees"
+            if entry_negations != negations:
+                continue  # "will it not go" is not a typo of "will it go"
+            edits = word_edits(words, entry_words)
+            if edits is not None and edits < best_edits:
+                best, best_edits = translation, edits
+        return best
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+            sentence_lang, meaning_lang = PHRASEBOOK_LANGS
+            for sentence, meaning in load_pairs():
+                memory.add(sentence, sentence_lang, meaning, meaning_lang, persist=False)
+            memory.load()
+            _memory = memory
+        return _memory
@@ -0,0 +1,258 @@
+import argparse
+import os
+import random
+import threading
+import time
+
+from core.metrics import metrics
+
+# Requests per second, burst, and concurrent calls for each free Google endpoint we use
+UPSTREAM_LIMITS = {
+    'translate': (5.0, 10, 4),
+    'gtts': (5.0, 10, 4),
+    'google_speech': (2.0, 4, 2),
+}
+MAX_ATTEMPTS = int(os.environ.get('UPSTREAM_MAX_ATTEMPTS', 4))
+BASE_DELAY_SECONDS = 0.5
+MAX_DELAY_SECONDS = 8.0
+# Consecutive failures (after retries) that open the circuit, and how long it stays open
+FAILURE_THRESHOLD = 5
+RESET_SECONDS = 30
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class UnsupportedLanguageError(ValueError):
+    """A language code the service doesn't offer; retrying can't fix it."""
+
+
+def _status_code(error):
+    # requests.Response is falsy for 4xx/5xx, so test for None rather than truthiness
+    response = getattr(error, 'response', None)
+    if response is None:
+        response = getattr(error, 'rsp', None)  # gTTSError
+    status = getattr(response, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+# An HTTP reply decides by its status: only 429 and 5xx are worth retrying. Without one,
+# the failure is the network or a throttled, garbled reply (googletrans then raises
+# AttributeError or JSONDecodeError), so it is retried unless it is one we know is permanent.
+def is_transient(error):
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return not isinstance(error, UnsupportedLanguageError)
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, at most ``burst`` saved up."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing, then lets one probe through after a cool-down."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                return True  # This caller is the probe
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+
+    # The probe ended without saying anything about the service (e.g. a bad language code):
+    # stay open, but let the very next caller probe instead of waiting out another cool-down
+    def abandon_probe(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+                self._opened_at = time.monotonic() - self.reset_seconds
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class Upstream:
+    """One rate-limited, retrying, circuit-broken door to an external service.
+
+    Calls wait for a token and a concurrency slot, retry transient failures
+    (``is_transient``) with full-jitter exponential backoff, and count them
+    towards the circuit breaker. Exceptions in ``give_up_on`` (e.g. "could not
+    understand audio") are answers, not failures: they are raised at once and
+    don't trip the breaker. Other non-transient errors are raised at once and
+    leave the breaker alone. While the circuit is open calls raise
+    CircuitOpenError so callers can fail over.
+    """
+
+    def __init__(self, name, rate, burst, max_concurrency, max_attempts=MAX_ATTEMPTS):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker()
+        self.max_attempts = max_attempts
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def _queue(self, delta):
+        with self._lock:
+            self._waiting += delta
+            waiting = self._waiting
+        metrics.set_gauge('upstream_queue_depth', waiting, upstream=self.name)
+
+    def call(self, func, *args, give_up_on=(), **kwargs):
+        if not self.breaker.allow():
+            metrics.inc('upstream_rejected_total', upstream=self.name)
+            raise CircuitOpenError(f"{self.name} is unavailable; retrying in {self.breaker.reset_seconds}s")
+        for attempt in range(self.max_attempts):
+            self._queue(1)
+            try:
+                self.bucket.acquire()
+                self._slots.acquire()
+            finally:
+                self._queue(-1)
+            try:
+                result = func(*args, **kwargs)
+            except give_up_on:
+                self.breaker.record_success()  # The service answered
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    metrics.inc('upstream_client_errors_total', upstream=self.name)
+                    # A probe must always settle the breaker, or it stays half-open and shut for good
+                    if _status_code(e) is not None:
+                        self.breaker.record_success()  # The service answered
+                    else:
+                        self.breaker.abandon_probe()
+                    raise
+                if attempt == self.max_attempts - 1:
+                    self.breaker.record_failure()
+                    metrics.inc('upstream_failures_total', upstream=self.name)
+                    metrics.set_gauge('upstream_circuit_open', int(self.breaker.state == OPEN), upstream=self.name)
+                    raise
+            else:
+                self.breaker.record_success()
+                metrics.set_gauge('upstream_circuit_open', 0, upstream=self.name)
+                return result
+            finally:
+                self._slots.release()
+            metrics.inc('upstream_retries_total', upstream=self.name)
+            time.sleep(random.uniform(0, min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** attempt)))
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name):
+    with _upstreams_lock:
+        upstream = _upstreams.get(name)
+        if upstream is None:
+            rate, burst, max_concurrency = UPSTREAM_LIMITS[name]
+            upstream = _upstreams[name] = Upstream(name, rate, burst, max_concurrency)
+        return upstream
+
+
+# Scripted probes against an open circuit. Each yields (state after the probe, whether the
+# next call is let through); half-open with nothing let through is the stuck state.
+def check_breaker():
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+        def __bool__(self):
+            return self.status_code < 400  # Like requests.Response
+
+    class HTTPError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"HTTP {status_code}")
+            self.response = Response(status_code)
+
+    def failing(error):
+        def call():
+            raise error
+        return call
+
+    results = {}
+    for name, error, want in (
+        ('unsupported-language probe', UnsupportedLanguageError("no voice"), (OPEN, True)),
+        ('http-400 probe', HTTPError(400), (CLOSED, True)),
+        ('garbled-reply probe', AttributeError("'NoneType' object has no attribute 'group'"), (OPEN, False)),
+    ):
+        upstream = Upstream(name, rate=1000, burst=1000, max_concurrency=1, max_attempts=1)
+        for _ in range(FAILURE_THRESHOLD):
+            try:
+                upstream.call(failing(ConnectionError("down")))
+            except ConnectionError:
+                pass
+        upstream.breaker._opened_at -= upstream.breaker.reset_seconds  # Cool-down over: next call probes
+        try:
+            upstream.call(failing(error))
+        except Exception:
+            pass
+        state = upstream.breaker.state
+        results[name] = ((state, upstream.breaker.allow()), want)
+    results['http-400 is transient'] = (is_transient(HTTPError(400)), False)
+    results['http-503 is transient'] = (is_transient(HTTPError(503)), True)
+    results['garbled reply is transient'] = (is_transient(AttributeError("group")), True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the upstream retry and circuit-breaker rules")
+    parser.add_argument('--check', action='store_true', help="run the breaker scenarios")
+    args = parser.parse_args()
+    if not args.check:
+        parser.print_help()
+        return
+    failed = False
+    for name, (got, want) in check_breaker().items():
+        ok = got == want
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {got} (want {want})")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,9 @@
 import speech_recognition as sr
-from googletrans import Translator
 import pyttsx3
 from langdetect import detect
-import pycountry
-import pygame
-from gtts import gTTS
-import os
-
-# Constants for file paths
-TEMP_AUDIO_PATH = 'C:/Users/shivr/OneDrive/Desktop/tireeedd/temp_translated_audio.mp3'
+from core.languages import get_lang_name
+from core.pipeline import get_pipeline
+from core.upstream import get_upstream
 
 # Function to speak text
 def speak(audio):
@@ -17,8 +12,7 @@ def speak(audio):
 
 # Function to get language name from language code
 def getLangName(lang_code):
-    language = pycountry.languages.get(alpha_2=lang_code)
-    return language.name if language else "Unknown"
+    return get_lang_name(lang_code)
 
 # Function to capture voice command
 def takecommand():
@@ -30,7 +24,8 @@ def takecommand():
 
     try:
         print("Recognizing...")
-        query = r.recognize_google(audio, language='en-in')
+        query = get_upstream('google_speech').call(r.recognize_google, audio, language='en-in',
+                                                   give_up_on=(sr.UnknownValueError,))
         print(f"The User said: {query}\n")
     except Exception as e:
         print("Say that again please...")
@@ -52,6 +47,8 @@ if __name__ == "__main__":
     voices = engine.getProperty('voices')
     engine.setProperty('voice', voices[1].id)
 
+    pipeline = get_pipeline()
+
     print("Welcome to the translator!")
     speak("Welcome to the translator!")
     print("Say the sentence you want to translate once you see the word 'Listening'")
@@ -96,26 +93,14 @@ if __name__ == "__main__":
         print(f"Language '{to_lang}' not supported for translation.")
         exit()
 
-    # Translate using Google Translate
-    translator = Translator()
-    text_to_translate = translator.translate(query, dest=gTTS_code)
-    translated_text = text_to_translate.text
-
-    # Use gTTS to convert the translated text to speech and save as MP3
-    tts = gTTS(text=translated_text, lang=gTTS_code)
-    tts.save(TEMP_AUDIO_PATH)
-    print(f"Translated audio saved as: {TEMP_AUDIO_PATH}")
-
-    # Initialize pygame mixer and play the saved audio
-    pygame.mixer.init()
-    pygame.mixer.music.load(TEMP_AUDIO_PATH)
-    pygame.mixer.music.play()
+    # Translate using Google Translate, through the shared on-disk cache
+    translated_text = pipeline.translate(query, 'auto', gTTS_code)
 
-    # Wait until the audio is finished playing
-    while pygame.mixer.music.get_busy():
-        continue
+    # Use gTTS to convert the translated text to speech, reusing the cached MP3 if we have one
+    audio_path = pipeline.synthesize_to_path(translated_text, gTTS_code)
+    print(f"Translated audio cached as: {audio_path}")
 
-    # Clean up temporary audio files
-    os.remove(TEMP_AUDIO_PATH)
+    # Play the cached audio on the audio worker and wait for it without spinning
+    pipeline.player.play(audio_path).result()
 
     print(f"Translated Text: {translated_text}")
@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import contextvars
+import functools
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from core.incremental_detect import IncrementalDetector
+from core.metrics import metrics, request_context
+from core.pipeline import get_pipeline
+from core.translation_memory import PHRASEBOOK_LANGS, get_translation_memory
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5000
+DEFAULT_MAX_CONCURRENCY = 8
+# Shared secret for /phrasebook writes. CORS is open to any page, so without it any
+# site the user visits could post "approved" translations; unset disables the endpoint.
+PHRASEBOOK_TOKEN = os.environ.get('PHRASEBOOK_TOKEN')
+
+
+# Run a blocking call (googletrans, langdetect, model load) off the event loop,
+# never more than max_concurrency at once
+async def run_blocking(request, func, *args):
+    app = request.app
+    async with app['semaphore']:
+        loop = asyncio.get_running_loop()
+        # run_in_executor doesn't carry context variables, so pass the request ID along
+        call = functools.partial(contextvars.copy_context().run, func, *args)
+        return await loop.run_in_executor(app['executor'], call)
+
+
+async def read_json(request):
+    try:
+        data = await request.json()
+    except Exception:
+        raise web.HTTPBadRequest(text='{"error": "Request body must be JSON"}', content_type="application/json")
+    if not isinstance(data, dict):
+        raise web.HTTPBadRequest(text='{"error": "Request body must be a JSON object"}', content_type="application/json")
+    text = data.get('text')
+    text = text.strip() if isinstance(text, str) else ''
+    if not text:
+        raise web.HTTPBadRequest(text='{"error": "No text provided"}', content_type="application/json")
+    return text, data
+
+
+async def handle_detect(request):
+    text, data = await read_json(request)
+    session_id = data.get('session_id')
+    if not session_id:
+        detected = await run_blocking(request, request.app['pipeline'].detect_language, text)
+        return web.json_response({'detected_language': detected})
+    # Live input box: only the characters appended since the last call are scored
+    detected, confidence, stable = await run_blocking(request, request.app['detector'].detect, session_id, text)
+    return web.json_response({'detected_language': detected, 'confidence': confidence, 'stable': stable})
+
+
+async def handle_translate(request):
+    text, data = await read_json(request)
+    if data.get('target_langs'):
+        return await handle_translate_many(request, text, data)
+    source_lang = data.get('source_lang') or 'auto'
+    target_lang = data.get('target_lang') or 'en'
+    try:
+        translated = await run_blocking(request, request.app['pipeline'].translate, text, source_lang, target_lang)
+    except Exception as e:
+        return web.json_response({'error': f"Translation error: {str(e)}"}, status=502)
+    return web.json_response({'translated_text': translated, 'source_lang': source_lang, 'target_lang': target_lang})
+
+
+# Several targets in one call: detect once, translate all concurrently, optionally score emotions in one batch
+async def handle_translate_many(request, text, data):
+    target_langs = data['target_langs']
+    if not isinstance(target_langs, list) or not all(isinstance(lang, str) for lang in target_langs):
+        return web.json_response({'error': "target_langs must be a list of language codes"}, status=400)
+    pipeline = request.app['pipeline']
+    try:
+        if data.get('emotion'):
+            await run_blocking(request, pipeline.emotion_classifier)
+    except Exception as e:
+        return web.json_response({'error': f"Emotion detection error: {str(e)}"}, status=500)
+    source_lang, results = await run_blocking(
+        request, pipeline.translate_to_many, text, target_langs, data.get('source_lang'), bool(data.get('emotion'))
+    )
+    translations = {}
+    for target_lang, result in results.items():
+        if 'error' in result:
+            translations[target_lang] = {'error': f"Translation error: {result['error']}"}
+            continue
+        translations[target_lang] = {'translated_text': result['translation']}
+        if 'emotion' in result:
+            emotion, score, _ = result['emotion']
+            translations[target_lang].update(emotion=emotion, score=score)
+    return web.json_response({'source_lang': source_lang, 'translations': translations})
+
+
+async def handle_emotion(request):
+    text, _ = await read_json(request)
+    try:
+        engine = await run_blocking(request, request.app['pipeline'].emotion_classifier)
+        # The engine batches on its own thread, so wait on its future without holding a slot
+        emotion, score, emotions = await asyncio.wrap_future(engine.submit(text))
+    except Exception as e:
+        return web.json_response({'error': f"Emotion detection error: {str(e)}"}, status=500)
+    return web.json_response({'emotion': emotion, 'score': score, 'emotions': emotions})
+
+
+# Pairs added on the rickshaw phrasebook page become approved translations
+async def handle_phrasebook(request):
+    if not PHRASEBOOK_TOKEN:
+        return web.json_response({'error': "Phrasebook writes are disabled; set PHRASEBOOK_TOKEN"}, status=403)
+    token = request.headers.get('X-Phrasebook-Token', '')
+    if not hmac.compare_digest(token.encode(), PHRASEBOOK_TOKEN.encode()):
+        return web.json_response({'error': "Invalid phrasebook token"}, status=403)
+    sentence, data = await read_json(request)
+    meaning = (data.get('meaning') or '').strip()
+    if not meaning:
+        return web.json_response({'error': "No meaning provided"}, status=400)
+    sentence_lang, meaning_lang = PHRASEBOOK_LANGS
+    source_lang = data.get('source_lang') or sentence_lang
+    target_lang = data.get('target_lang') or meaning_lang
+    memory = await run_blocking(request, get_translation_memory)
+    await run_blocking(request, memory.add, sentence, source_lang, meaning, target_lang)
+    return web.json_response({'entries': len(memory)})
+
+
+# Cached audio is sent straight from disk; anything else is synthesized once and cached
+async def handle_tts(request):
+    text = (request.query.get('text') or '').strip()
+    language_code = request.query.get('lang') or 'en'
+    if not text:
+        return web.json_response({'error': "No text provided"}, status=400)
+    # The first call builds the cache (a walk of its directory); keep that disk I/O off the loop
+    path = await run_blocking(request, lambda: request.app['pipeline'].audio_cache.get_path(text, language_code))
+    if path is not None:
+        return web.FileResponse(path, headers={'Content-Type': 'audio/mpeg'})
+    try:
+        audio = await run_blocking(request, request.app['pipeline'].synthesize, text, language_code)
+    except Exception as e:
+        return web.json_response({'error': f"Text-to-speech error: {str(e)}"}, status=502)
+    return web.Response(body=audio, content_type='audio/mpeg')
+
+
+async def handle_metrics(request):
+    return web.Response(text=metrics.prometheus_text(), content_type='text/plain', charset='utf-8')
+
+
+# Spans are named by the matched route, never the raw path, so scans for random URLs add one series, not one each
+def route_name(request):
+    resource = request.match_info.route.resource
+    return resource.canonical if resource is not None else '/unmatched'
+
+
+# Each request gets an ID (the caller's X-Request-ID if sent) that tags its spans
+@web.middleware
+async def tracing_middleware(request, handler):
+    if request.method == 'OPTIONS' or request.path == '/metrics':
+        return await handler(request)
+    with request_context(request.headers.get('X-Request-ID')) as request_id:
+        with metrics.span(f"http{route_name(request).replace('/', '_')}"):
+            response = await handler(request)
+        response.headers['X-Request-ID'] = request_id
+        return response
+
+
+# app.js is opened from disk or another port, so answer CORS preflights ourselves
+@web.middleware
+async def cors_middleware(request, handler):
+    if request.method == 'OPTIONS':
+        response = web.Response()
+    else:
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            response = e
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Phrasebook-Token'
+    return response
+
+
+async def close_executor(app):
+    app['executor'].shutdown(wait=False, cancel_futures=True)
+
+
+def create_app(max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    app = web.Application(middlewares=[cors_middleware, tracing_middleware])
+    app['semaphore'] = asyncio.Semaphore(max_concurrency)
+    app['executor'] = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="server")
+    app['pipeline'] = get_pipeline()
+    app['detector'] = IncrementalDetector()
+    app.on_cleanup.append(close_executor)
+    for path, handler in (('/detect', handle_detect), ('/translate', handle_translate), ('/emotion', handle_emotion),
+                          ('/phrasebook', handle_phrasebook)):
+        app.router.add_post(path, handler)
+        app.router.add_route('OPTIONS', path, handler)
+    app.router.add_get('/tts', handle_tts)
+    app.router.add_get('/metrics', handle_metrics)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translation and emotion backend for app.js")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    web.run_app(create_app(args.max_concurrency), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
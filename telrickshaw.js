@@ -28,6 +28,23 @@ document.getElementById('addBtn').addEventListener('click', function() {
     // Append the list item to the conversation list
     document.getElementById('conversation-list').appendChild(listItem);
 
+    // Save the pair on the server so translations of this sentence use it.
+    // The server only accepts pairs carrying its PHRASEBOOK_TOKEN, asked for once and remembered.
+    let token = localStorage.getItem('phrasebookToken');
+    if (!token) {
+        token = prompt('Phrasebook token (PHRASEBOOK_TOKEN on the server) to save this pair:') || '';
+        if (token) localStorage.setItem('phrasebookToken', token);
+    }
+    if (token) {
+        fetch('http://127.0.0.1:5000/phrasebook', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-Phrasebook-Token': token },
+            body: JSON.stringify({ text: sentence, meaning: meaning })
+        }).then(response => {
+            if (response.status === 403) localStorage.removeItem('phrasebookToken');
+        }).catch(error => console.error('Error saving phrase:', error));
+    }
+
     // Clear input fields
     document.getElementById('sentence').value = '';
     document.getElementById('meaning').value = '';
@@ -1,142 +1,26 @@
+import time
+_import_started = time.perf_counter()
 import streamlit as st
-import speech_recognition as sr
-from googletrans import Translator
-import pyttsx3
-from langdetect import detect
-import pycountry
-import pygame
-import io
-from gtts import gTTS
-import webbrowser
-from transformers import pipeline
+import ui
+from core.languages import MAJOR_AND_WORLD_LANGUAGES
+from core.metrics import metrics, begin_request
+metrics.record_startup('trail_imports', time.perf_counter() - _import_started)
 
 # Set page config
 st.set_page_config(page_title="Translation & Emotion Detection App", layout="wide")
 
-# Initialize components with proper error handling
-@st.cache_resource
-def initialize_components():
-    components = {}
-    try:
-        components['emotion_classifier'] = pipeline("text-classification", 
-                                                 model="bhadresh-savani/distilbert-base-uncased-emotion")
-        components['engine'] = pyttsx3.init('sapi5')
-        components['translator'] = Translator()
-        components['recognizer'] = sr.Recognizer()
-        pygame.mixer.init()
-        
-        # Set voice properties
-        voices = components['engine'].getProperty('voices')
-        components['engine'].setProperty('voice', voices[1].id)
-        
-        return components
-    except Exception as e:
-        st.error(f"Error initializing components: {str(e)}")
-        return None
-
-# Initialize components
-components = initialize_components()
-if not components:
-    st.stop()
-
-# Helper functions
-def speak(audio, engine):
-    try:
-        engine.say(audio)
-        engine.runAndWait()
-    except Exception as e:
-        st.error(f"Speech error: {str(e)}")
-
-def detect_language(text):
-    try:
-        return detect(text)
-    except:
-        return "en"
-
-def get_lang_name(lang_code):
-    try:
-        language = pycountry.languages.get(alpha_2=lang_code)
-        return language.name if language else "Unknown"
-    except:
-        return "Unknown"
-
-def take_command(recognizer):
-    try:
-        with sr.Microphone() as source:
-            with st.spinner("Listening... Please speak now..."):
-                recognizer.adjust_for_ambient_noise(source)
-                audio = recognizer.listen(source, timeout=5)
-
-            with st.spinner("Recognizing..."):
-                query = recognizer.recognize_google(audio, language='en-in')
-                st.info(f"You said: {query}")
-                return query
-    except sr.RequestError:
-        st.error("Could not connect to speech recognition service")
-    except sr.UnknownValueError:
-        st.warning("Could not understand audio")
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-    return None
-
-def translate_text(text, source_lang, target_lang, translator):
-    try:
-        translation = translator.translate(text, src=source_lang, dest=target_lang)
-        return translation.text
-    except Exception as e:
-        st.error(f"Translation error: {str(e)}")
-        return text
-
-def text_to_speech(text, language_code):
-    try:
-        tts = gTTS(text=text, lang=language_code)
-        mp3_fp = io.BytesIO()
-        tts.write_to_fp(mp3_fp)
-        mp3_fp.seek(0)
-        pygame.mixer.music.load(mp3_fp)
-        pygame.mixer.music.play()
-        
-        # Wait for the audio to finish playing
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-    except Exception as e:
-        st.error(f"Text-to-speech error: {str(e)}")
-
-def detect_emotion(text, classifier):
-    try:
-        predictions = classifier(text)
-        emotions = {item['label']: item['score'] for item in predictions}
-        top_emotion = max(emotions, key=emotions.get)
-        top_score = emotions[top_emotion]
-        return top_emotion, top_score, emotions
-    except Exception as e:
-        st.error(f"Emotion detection error: {str(e)}")
-        return "unknown", 0.0, {}
-
-def display_emotion_analysis(text, classifier, label="Text"):
-    if text:
-        st.write(f"{label} Emotions:")
-        emotion, score, emotions = detect_emotion(text, classifier)
-        st.write(f"Primary Emotion: {emotion.capitalize()} ({score:.2%})")
-        
-        # Create emotion data for chart
-        emotion_data = {
-            'Emotion': list(emotions.keys()),
-            'Confidence': [score for score in emotions.values()]
-        }
-        st.bar_chart(emotion_data, x='Emotion', y='Confidence')
+# Components are built lazily on first use; warm the emotion model in the background
+# so the first paint doesn't wait for it
+ui.pipeline.components.warm('emotion_classifier')
 
 def main():
     st.title("Voice Translation & Emotion Detection App")
     st.write("This app allows you to translate text/speech and analyze emotions.")
 
+    ui.display_component_status()
+
     # Language codes mapping
-    lang_code = {
-        "English": "en", "Hindi": "hi", "Tamil": "ta", "Telugu": "te", "Bengali": "bn",
-        "Marathi": "mr", "Gujarati": "gu", "Punjabi": "pa", "Malayalam": "ml", "Kannada": "kn",
-        "Odia": "or", "Urdu": "ur", "Spanish": "es", "French": "fr", "German": "de",
-        "Italian": "it", "Portuguese": "pt", "Russian": "ru", "Japanese": "ja", "Korean": "ko"
-    }
+    lang_code = MAJOR_AND_WORLD_LANGUAGES
 
     # Create columns for the main layout
     col1, col2 = st.columns([2, 1])
@@ -151,80 +35,54 @@ def main():
             target_language = st.selectbox("Target Language:", list(lang_code.keys()), key="target1")
 
             if st.button("Translate and Speak"):
+                begin_request()
                 if input_text:
                     with st.spinner("Translating..."):
                         source_lang_code = lang_code[source_language]
                         target_lang_code = lang_code[target_language]
-                        translated_text = translate_text(input_text, source_lang_code, 
-                                                      target_lang_code, components['translator'])
-                        
-                        st.success(f"Translated text: {translated_text}")
-                        text_to_speech(translated_text, target_lang_code)
-                        
-                        # Display emotion analysis
-                        st.subheader("Emotion Analysis")
-                        display_emotion_analysis(input_text, components['emotion_classifier'], 
-                                              "Original Text")
-                        display_emotion_analysis(translated_text, components['emotion_classifier'], 
-                                              "Translated Text")
+                        translated_text = ui.stream_translation(input_text, source_lang_code, target_lang_code)
+                        ui.text_to_speech(translated_text, target_lang_code)
+                        ui.display_emotion_analysis(input_text, translated_text)
                 else:
                     st.warning("Please enter some text.")
 
         else:  # Speech Input
             source_language = st.selectbox("Source Language:", list(lang_code.keys()), key="source2")
             target_language = st.selectbox("Target Language:", list(lang_code.keys()), key="target2")
+            live = st.checkbox("Translate while I speak", key="live2")
 
             if st.button("Start Recording"):
-                spoken_text = take_command(components['recognizer'])
+                begin_request()
+                source_lang_code = lang_code[source_language]
+                target_lang_code = lang_code[target_language]
+                if live:
+                    spoken_text, translated_text = ui.stream_command(source_lang_code, target_lang_code)
+                else:
+                    spoken_text = ui.take_command(source_lang_code, timeout=5)
+                    translated_text = None
                 if spoken_text:
-                    detected_lang = detect_language(spoken_text)
-                    st.write(f"Detected Language: {get_lang_name(detected_lang)}")
-                    
-                    source_lang_code = lang_code[source_language]
-                    target_lang_code = lang_code[target_language]
-                    translated_text = translate_text(spoken_text, source_lang_code, 
-                                                  target_lang_code, components['translator'])
+                    detected_lang = ui.detect_language(spoken_text)
+                    st.write(f"Detected Language: {ui.get_lang_name(detected_lang)}")
                     
-                    st.success(f"Translated text: {translated_text}")
-                    text_to_speech(translated_text, target_lang_code)
+                    if translated_text is None:
+                        translated_text = ui.translate_text(spoken_text, source_lang_code, target_lang_code)
+                        st.success(f"Translated text: {translated_text}")
+                    ui.text_to_speech(translated_text, target_lang_code)
                     
-                    # Display emotion analysis
-                    st.subheader("Emotion Analysis")
-                    display_emotion_analysis(spoken_text, components['emotion_classifier'], 
-                                          "Original Speech")
+                    ui.display_emotion_analysis(spoken_text, labels=("Original Speech Emotions",))
 
     with col2:
         st.header("Emotion Analysis")
         emotion_text = st.text_area("Enter text to analyze emotions:", key="emotion_text")
         
         if st.button("Analyze Emotions"):
+            begin_request()
             if emotion_text:
-                display_emotion_analysis(emotion_text, components['emotion_classifier'])
+                ui.display_emotion_analysis(emotion_text, labels=("Text Emotions",))
             else:
                 st.warning("Please enter some text to analyze emotions.")
         
-        # Helper section
-        st.markdown("""
-            <style>
-            .helper-section {
-                padding: 20px;
-                border-radius: 5px;
-                background-color: #f0f2f6;
-                margin-top: 20px;
-            }
-            </style>
-            <div class='helper-section'>
-            <h3>Need Help?</h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("Open Help Guide"):
-            try:
-                webbrowser.open_new_tab('C:\\Users\\shivr\\OneDrive\\Desktop\\tireeedd\\pages\\front page\\page1.html')
-                st.success("Help guide opened in new tab!")
-            except Exception as e:
-                st.error(f"Error opening help guide: {str(e)}")
-                st.info("Please make sure the help file exists at the specified location.")
+        ui.display_help()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,275 @@
+import functools
+import time
+import streamlit as st
+import webbrowser
+from core.jobs import FAILED
+from core.metrics import begin_request
+from core.pipeline import get_pipeline
+
+# Shared Streamlit layer: every page renders through these, the work itself happens in core.pipeline
+pipeline = get_pipeline()
+
+HELP_PAGE = 'C:\\Users\\shivr\\OneDrive\\Desktop\\tireeedd\\pages\\front page\\page1.html'
+EMOTION_LABELS = ("Original Text Emotions", "Translated Text Emotions")
+# How often a page with a running job reruns itself to refresh the progress bar
+JOB_POLL_SECONDS = 0.5
+
+
+def speak(audio):
+    try:
+        pipeline.speak_offline(audio)
+    except Exception as e:
+        st.error(f"Speech error: {str(e)}")
+
+@st.cache_data
+def detect_language(text):
+    return pipeline.detect_language(text)
+
+@st.cache_data
+def get_lang_name(lang_code):
+    return pipeline.language_name(lang_code)
+
+def load_component(name):
+    if not pipeline.components.is_ready(name):
+        with st.spinner(f"Loading {name.replace('_', ' ')}..."):
+            return pipeline.components.get(name)
+    return pipeline.components.get(name)
+
+def take_command(language='en', timeout=None):
+    import speech_recognition as sr
+    try:
+        with pipeline.microphone() as source:
+            with st.spinner("Listening... Please speak now..."):
+                audio = pipeline.listen(source, timeout=timeout)
+
+        with st.spinner("Recognizing..."):
+            query = pipeline.recognize(audio, language)
+            st.info(f"You said: {query}")
+            return query
+    except sr.RequestError:
+        st.error("Could not connect to speech recognition service")
+    except sr.UnknownValueError:
+        st.warning("Could not understand audio")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+    return None
+
+def stream_command(source_lang, target_lang):
+    import speech_recognition as sr
+    try:
+        with pipeline.microphone() as source:
+            st.info("Listening... Each phrase is translated as soon as you pause.")
+            spoken_placeholder = st.empty()
+            translated_placeholder = st.empty()
+            spoken_text, translated_text = "", ""
+            for segment, error in pipeline.iter_transcripts(source, source_lang):
+                if error is not None:
+                    st.warning(f"Could not recognize a phrase: {str(error)}")
+                    continue
+                spoken_text = f"{spoken_text} {segment}".strip()
+                spoken_placeholder.info(f"You said: {spoken_text}")
+                translated_text = f"{translated_text} {translate_text(segment, source_lang, target_lang)}".strip()
+                translated_placeholder.success(f"Translated text: {translated_text}")
+            return spoken_text, translated_text
+    except sr.WaitTimeoutError:
+        st.warning("No speech detected")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+    return None, None
+
+def translate_text(text, source_lang, target_lang):
+    try:
+        return pipeline.translate(text, source_lang, target_lang)
+    except Exception as e:
+        st.error(f"Translation error: {str(e)}")
+        return text
+
+def stream_translation(text, source_lang, target_lang):
+    from core.translation import LONG_TEXT_THRESHOLD
+    if len(text) <= LONG_TEXT_THRESHOLD:
+        translated_text = translate_text(text, source_lang, target_lang)
+        st.success(f"Translated text: {translated_text}")
+        return translated_text
+    # Long input: show each sentence as soon as it is translated
+    placeholder = st.empty()
+    translated_text = ""
+    for piece, error in pipeline.iter_translate(text, source_lang, target_lang):
+        if error is not None:
+            st.warning(f"Could not translate a sentence: {str(error)}")
+        translated_text += piece
+        placeholder.success(f"Translated text: {translated_text}")
+    return translated_text
+
+def text_to_speech(text, language_code):
+    try:
+        # Playback runs on the audio worker thread, so emotion analysis can start right away
+        pipeline.speak(text, language_code)
+    except Exception as e:
+        st.error(f"Text-to-speech error: {str(e)}")
+
+def detect_emotions(texts):
+    try:
+        load_component('emotion_classifier')
+        return pipeline.classify_emotions(texts)
+    except Exception as e:
+        st.error(f"Emotion detection error: {str(e)}")
+        return [("unknown", 0.0, {})] * len(texts)
+
+def detect_emotion(text):
+    return detect_emotions([text])[0]
+
+def display_component_status():
+    with st.sidebar.expander("Components"):
+        for name, info in pipeline.status().items():
+            st.write(f"{name}: {info['status']}")
+
+def display_emotions(label, result):
+    st.write(f"{label}:")
+    emotion, score, emotions = result
+    st.write(f"Primary Emotion: {emotion.capitalize()} ({score:.2%})")
+    emotion_data = {
+        'Emotion': list(emotions.keys()),
+        'Confidence': [score for score in emotions.values()]
+    }
+    st.bar_chart(emotion_data, x='Emotion', y='Confidence')
+
+def display_emotion_results(results, labels=EMOTION_LABELS):
+    st.subheader("Emotion Analysis")
+    for label, result in zip(labels, results):
+        display_emotions(label, result)
+
+def display_emotion_analysis(original_text, translated_text=None, labels=EMOTION_LABELS):
+    # Both texts go to the classifier together so they share one batch
+    texts = [original_text, translated_text] if translated_text else [original_text]
+    display_emotion_results(detect_emotions(texts), labels)
+
+# Heavy work runs on the job queue; the session only remembers the job ID and how to show its result
+def start_job(state_key, render, func, *args):
+    st.session_state[state_key] = {'id': pipeline.submit(func, *args), 'render': render}
+
+def running_job(state_key):
+    entry = st.session_state.get(state_key)
+    job = pipeline.job(entry['id']) if entry else None
+    return job if job is not None and not job.done else None
+
+# Call on every rerun: shows progress while the job runs, then its result until the next job replaces it
+def show_job(state_key):
+    entry = st.session_state.get(state_key)
+    if entry is None:
+        return
+    job = pipeline.job(entry['id'])
+    if job is None:
+        del st.session_state[state_key]  # Expired from the queue
+        return
+    if not job.done:
+        st.progress(job.progress, text=job.message or "Working...")
+        if job.partial:
+            st.success(f"Translated text: {job.partial}")  # Long input: sentences as they arrive
+    elif job.status == FAILED:
+        st.error(f"Translation error: {str(job.error)}")
+    else:
+        entry['render'](job.result)
+
+# Call last on the page, so everything else has rendered before the script reruns to refresh progress
+def poll_jobs(*state_keys):
+    if any(running_job(state_key) for state_key in state_keys):
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+def display_translation_result(result, labels=EMOTION_LABELS):
+    for error in result['translation_errors']:
+        st.warning(f"Could not translate a sentence: {error}")
+    st.success(f"Translated text: {result['translation']}")
+    if 'speech_error' in result:
+        st.error(f"Text-to-speech error: {result['speech_error']}")
+    if 'emotion_error' in result:
+        st.error(f"Emotion detection error: {result['emotion_error']}")
+    else:
+        display_emotion_results(result['emotions'], labels)
+
+def display_multi_target(target_languages, target_codes, job_result):
+    if 'emotion_error' in job_result:
+        st.error(f"Emotion detection error: {job_result['emotion_error']}")
+    for name, code in zip(target_languages, target_codes):
+        result = job_result['results'][code]
+        st.subheader(name)
+        if 'error' in result:
+            st.error(f"Translation error: {result['error']}")
+            continue
+        st.success(result['translation'])
+        if 'emotion' in result:
+            emotion, score, _ = result['emotion']
+            st.write(f"Primary Emotion: {emotion.capitalize()} ({score:.2%})")
+        if 'audio' in result:
+            st.audio(result['audio'], format='audio/mp3')
+        elif 'audio_error' in result:
+            st.warning(f"Text-to-speech error: {result['audio_error']}")
+
+def display_help(label="Open Help Guide", key=None):
+    st.markdown("""
+        <style>
+        .helper-section {
+            padding: 20px;
+            border-radius: 5px;
+            background-color: #f0f2f6;
+            margin-top: 20px;
+        }
+        </style>
+        <div class='helper-section'>
+        <h3>Need Help?</h3>
+        </div>
+    """, unsafe_allow_html=True)
+
+    if st.button(label, key=key, help="Click to open the help documentation"):
+        try:
+            webbrowser.open_new_tab(HELP_PAGE)
+            st.success("Help guide opened in new tab!")
+        except Exception as e:
+            st.error(f"Error opening help guide: {str(e)}")
+            st.info("Please make sure the help file exists at the specified location.")
+
+def handle_text_input(lang_code, labels=EMOTION_LABELS):
+    input_text = st.text_area("Enter text to translate:", key="translate_text")
+    source_language = st.selectbox("Source Language:", list(lang_code.keys()))
+    multiple = st.checkbox("Translate into several languages")
+    if multiple:
+        target_languages = st.multiselect("Target Languages:", list(lang_code.keys()))
+        with_audio = st.checkbox("Synthesize speech for every language")
+    else:
+        target_language = st.selectbox("Target Language:", list(lang_code.keys()))
+    
+    if st.button("Translate and Speak"):
+        begin_request()
+        source_lang_code = lang_code.get(source_language, 'en')
+        if running_job('translate_job'):
+            st.warning("Still working on the previous translation.")
+        elif input_text and multiple:
+            if target_languages:
+                target_codes = [lang_code.get(name, 'en') for name in target_languages]
+                start_job('translate_job', functools.partial(display_multi_target, target_languages, target_codes),
+                          pipeline.translate_to_many_job, input_text, target_codes, source_lang_code, True, with_audio)
+            else:
+                st.warning("Please choose at least one target language.")
+        elif input_text:
+            start_job('translate_job', functools.partial(display_translation_result, labels=labels),
+                      pipeline.translate_and_speak, input_text, source_lang_code, lang_code.get(target_language, 'en'))
+        else:
+            st.warning("Please enter some text.")
+
+    show_job('translate_job')
+
+def handle_emotion_analysis(labels=EMOTION_LABELS):
+    st.header("Additional Emotion Analysis")
+    emotion_text = st.text_area("Enter text to analyze emotions:", key="emotion_text")
+    
+    if st.button("Analyze Emotions"):
+        begin_request()
+        if emotion_text:
+            display_emotion_analysis(emotion_text, labels=labels)
+        else:
+            st.warning("Please enter some text to analyze emotions.")
+    
+    # Add some spacing
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    display_help(key="helper_button")